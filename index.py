@@ -1,20 +1,45 @@
 import sys
 import os
+import time
+
+# Marcado antes dos imports pesados (Qt, ReportLab) para medir o tempo até interativo
+INICIO_PROCESSO = time.perf_counter()
+
 import json
+import csv
+import hashlib
+import mmap
+import zlib
+import sqlite3
+import argparse
 import requests
 import subprocess
 import urllib.request
 import tempfile
+import shutil
+import threading
+import queue
+import re
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from io import BytesIO
 from datetime import datetime
+from string import Template
 from PyQt6.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout,
     QLabel, QLineEdit, QTextEdit, QDateEdit, QPushButton,
     QGroupBox, QFormLayout, QTableWidget, QTableWidgetItem,
     QMessageBox, QHeaderView, QAbstractItemView, QFileDialog,
-    QDialog
+    QDialog, QComboBox, QCheckBox, QTabWidget
 )
-from PyQt6.QtCore import Qt, QDate, QRegularExpression, QSize, QThread, pyqtSignal, QTimer
-from PyQt6.QtGui import QRegularExpressionValidator, QIcon, QPixmap
+from PyQt6.QtCore import Qt, QDate, QRegularExpression, QSize, QThread, pyqtSignal, QTimer, QBuffer, QByteArray, QIODevice
+from PyQt6.QtGui import QRegularExpressionValidator, QIcon, QPixmap, QKeySequence, QShortcut, QPainter, QColor
+try:
+    from PyQt6.QtPdf import QPdfDocument
+except ImportError:
+    QPdfDocument = None
 from reportlab.lib.pagesizes import A4
 from reportlab.lib import colors
 from reportlab.lib.colors import HexColor
@@ -25,14 +50,20 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_RIGHT
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
-from PIL import Image as PilImage
+from PIL import Image as PilImage, ImageOps
 
 # --- Constantes e Paths ---
 CURRENT_VERSION = "v1.5"
 CONFIG_FILE = os.path.expanduser("~/.orcamento_config.json")
+DIARIO_FILE = os.path.expanduser("~/.orcamento_diario.log")
+DADOS_FILE = os.path.expanduser("~/.orcamento_dados.db")
 LOGO_PNG_PATH = os.path.join(os.path.abspath("."), "logo.png")
 LOGO_ICO_PATH = os.path.join(os.path.abspath("."), "logo.ico")
 
+# Logo: maior lado usado na tela/PDF (80pt no PDF ~ 330px a 300 dpi; splash 200px em telas 2x)
+LOGO_LADO_MAX = 400
+LOGO_ICO_TAMANHOS = [(16, 16), (24, 24), (32, 32), (48, 48), (64, 64), (128, 128), (256, 256)]
+
 # Github info para launcher
 GITHUB_OWNER = "cauanlbp"
 GITHUB_REPO = "ProjetoOrcamento"
@@ -40,7 +71,259 @@ LOCAL_VERSION = "1.5"
 INSTALLER_URL_TEMPLATE = "https://github.com/{owner}/{repo}/releases/download/v{version}/orcamentos.exe"
 APP_EXE_NAME = "orcamento.exe"
 
+# Mesmas regras dos campos de quantidade e valor unitário
+REGEX_QUANTIDADE = r"[1-9][0-9]*"
+REGEX_VALOR_UNITARIO = r"[0-9]+([.,][0-9]{0,2})?"
+IMPORTACAO_MAX_ERROS_EXIBIDOS = 20
+
+# Pré-visualização do PDF
+PREVIEW_DEBOUNCE_MS = 250
+PREVIEW_LARGURA = 360
+PREVIEW_CACHE_MAX = 64
+
+# ORCAMENTO_DEBUG=1 mostra no console quanto cada pré-visualização, tema e relatório levou
+DEBUG_TEMPOS = os.environ.get("ORCAMENTO_DEBUG") == "1"
+
+# Processos que geram os PDFs finais de todas as abas
+RENDER_WORKERS = 2
+
+# Servidor HTTP local de orçamentos
+SERVIDOR_HOST = "0.0.0.0"
+SERVIDOR_PORTA = 8765
+SERVIDOR_WORKERS = 2
+SERVIDOR_FILA_MAX = 8
+SERVIDOR_CORPO_MAX = 1024 * 1024
+
+# Gravação dos PDFs: {data} = dd-MM-yyyy, {ano}, {mes}, {dia}, {cliente}
+LAYOUT_PASTAS_PADRAO = "{data}"
+
+# Modo contêiner: PDFs anexados em arquivos mensais com blocos deduplicados
+CONTEINER_EXTENSAO = ".orcpak"
+CONTEINER_INDICE_EXTENSAO = ".orcidx"
+CONTEINER_BLOCO_MIN = 1024
+
+# Diário de recuperação: compacta depois de tantos registros
+DIARIO_COMPACTAR_APOS = 500
+
+# Quantidade máxima de ações guardadas para desfazer
+DESFAZER_MAX = 200
+
+# Relatórios: quantas barras aparecem no gráfico
+RELATORIO_MAX_BARRAS = 12
+
+# Indexação dos PDFs antigos: resultados gravados por transação
+INDEXADOR_LOTE = 200
+
+# Tempo até a janela principal ficar utilizável: mediana medida (--medir-inicio, 7 execuções)
+# e a folga aceita antes de considerar regressão. A referência depende da máquina: em cada
+# máquina meça a mediana e informe em ORCAMENTO_REFERENCIA_INICIO_MS (300 ms é a do desenvolvimento)
+TEMPO_INTERATIVO_REFERENCIA_MS = int(os.environ.get("ORCAMENTO_REFERENCIA_INICIO_MS", 300))
+TEMPO_INTERATIVO_MARGEM = 1.5
+TEMPO_INTERATIVO_LIMITE_MS = TEMPO_INTERATIVO_REFERENCIA_MS * TEMPO_INTERATIVO_MARGEM
+
+# --- Temas ---
+# Uma única folha de estilo para o app inteiro; os widgets só recebem objectName/propriedades
+TEMAS = {
+    "claro": {
+        "fundo": "#f0f4f8",
+        "texto": "#334155",
+        "texto_secundario": "#64748b",
+        "campo": "white",
+        "borda": "#cbd5e1",
+        "card": "#f9fafb",
+        "navbar": "#1e293b",
+        "navbar_hover": "#334155",
+        "navbar_pressionado": "#475569",
+        "primario": "#60a5fa",
+        "primario_escuro": "#3b82f6",
+        "perigo": "#ef4444",
+        "perigo_escuro": "#b91c1c",
+        "cabecalho_tabela": "#e2e8f0",
+        "selecao": "#bfdbfe",
+        "selecao_texto": "#1e293b",
+        "papel": "white",
+    },
+    "escuro": {
+        "fundo": "#0f172a",
+        "texto": "#e2e8f0",
+        "texto_secundario": "#94a3b8",
+        "campo": "#1e293b",
+        "borda": "#334155",
+        "card": "#111c31",
+        "navbar": "#020617",
+        "navbar_hover": "#1e293b",
+        "navbar_pressionado": "#334155",
+        "primario": "#3b82f6",
+        "primario_escuro": "#2563eb",
+        "perigo": "#dc2626",
+        "perigo_escuro": "#991b1b",
+        "cabecalho_tabela": "#1e293b",
+        "selecao": "#1d4ed8",
+        "selecao_texto": "white",
+        "papel": "white",
+    },
+}
+TEMA_PADRAO = "claro"
+
+MODELO_ESTILO = Template("""
+    QWidget {
+        background-color: $fundo;
+        color: $texto;
+        font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
+        font-size: 14px;
+    }
+    QLineEdit, QTextEdit, QDateEdit, QComboBox, QTableWidget {
+        background-color: $campo;
+        color: $texto;
+        border: 1px solid $borda;
+        border-radius: 4px;
+    }
+    QPushButton {
+        background-color: $primario;
+        color: white;
+        border-radius: 6px;
+        padding: 6px;
+    }
+    QPushButton:hover {
+        background-color: $primario_escuro;
+    }
+    QHeaderView::section {
+        background-color: $cabecalho_tabela;
+        color: $texto;
+        font-weight: 600;
+        border: none;
+    }
+    QTableWidget {
+        gridline-color: $borda;
+    }
+    QTableWidget::item:selected {
+        background-color: $selecao;
+        color: $selecao_texto;
+    }
+
+    QWidget#launcher, QWidget#launcher * {
+        background-color: transparent;
+    }
+    QLabel#statusLauncher {
+        color: white;
+        font-size: 14px;
+    }
+
+    QWidget#navbar {
+        background-color: $navbar;
+    }
+    QPushButton[variante="navbar"] {
+        color: white;
+        background-color: transparent;
+        border: none;
+        font-size: 32px;
+        font-weight: bold;
+    }
+    QPushButton[variante="navbar"]:hover {
+        background-color: $navbar_hover;
+    }
+    QPushButton[variante="navbar"]:pressed {
+        background-color: $navbar_pressionado;
+    }
+
+    QLabel#titulo {
+        font-size: 30px;
+        font-weight: 600;
+        color: $texto;
+    }
+    QLabel#subtitulo {
+        color: $texto_secundario;
+        font-size: 15px;
+    }
+    QLabel#tituloConfig {
+        font-size: 24px;
+        font-weight: 600;
+        color: $texto;
+    }
+    QLabel#totalGeral {
+        font-weight: 600;
+        font-size: 18px;
+        color: $primario_escuro;
+    }
+    QLabel[variante="moldura"] {
+        border: 1px solid $borda;
+        background-color: $papel;
+    }
+
+    QGroupBox[variante="card"], QGroupBox[variante="card-config"] {
+        font-weight: 600;
+        border: 1px solid $borda;
+        border-radius: 8px;
+        padding: 10px;
+        background-color: $card;
+        color: $texto;
+    }
+    QGroupBox[variante="card-config"] {
+        padding: 15px;
+    }
+
+    QPushButton[variante="primario"] {
+        background: qlineargradient(x1:0, y1:0, x2:1, y2:1,
+                                    stop:0 $primario, stop:1 $primario_escuro);
+        color: white;
+        padding: 8px;
+        font-weight: 600;
+        border-radius: 6px;
+    }
+    QPushButton[variante="perigo"] {
+        background: qlineargradient(x1:0, y1:0, x2:1, y2:1,
+                                    stop:0 $perigo, stop:1 $perigo_escuro);
+        color: white;
+        padding: 8px;
+        font-weight: 600;
+        border-radius: 6px;
+    }
+    QPushButton#gerarPdf {
+        padding: 12px;
+        border-radius: 8px;
+        font-size: 16px;
+        margin-top: 20px;
+    }
+    QPushButton#salvarConfig {
+        padding: 10px;
+        margin-top: 20px;
+    }
+    QTabBar::tab {
+        background-color: $cabecalho_tabela;
+        color: $texto_secundario;
+        padding: 6px 14px;
+        border-top-left-radius: 6px;
+        border-top-right-radius: 6px;
+        margin-right: 2px;
+    }
+    QTabBar::tab:selected {
+        background-color: $card;
+        color: $texto;
+        font-weight: 600;
+    }
+""")
+
+_estilos_compilados = {}
+
+def compilar_tema(nome):
+    if nome not in _estilos_compilados:
+        _estilos_compilados[nome] = MODELO_ESTILO.substitute(TEMAS.get(nome, TEMAS[TEMA_PADRAO]))
+    return _estilos_compilados[nome]
+
+def aplicar_tema(nome):
+    # Uma única chamada no QApplication: o Qt analisa a folha uma vez para todos os widgets
+    inicio = time.perf_counter()
+    QApplication.instance().setStyleSheet(compilar_tema(nome))
+    if DEBUG_TEMPOS:
+        print(f"Tema '{nome}' aplicado em {(time.perf_counter() - inicio) * 1000:.1f} ms")
+
+
 # --- Funções auxiliares ---
+def pool_processos(workers=None):
+    # Sempre "spawn": estes pools são criados em threads do processo do Qt, e um fork
+    # com várias threads rodando pode herdar locks presos
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
 def resource_path(relative_path):
     try:
         base_path = sys._MEIPASS
@@ -83,68 +366,124 @@ def save_config(config):
 def formatar_valor(valor):
     return f"{valor:,.2f}".replace(".", ",")
 
-def gerar_orcamento_pdf(nome_arquivo, items, cliente_info, config):
-    nome, endereco, numero, data = cliente_info
+def formatar_moeda(valor):
+    return f"R$ {valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+
+MAX_LINHAS_POR_TABELA = 15
+
+_estilos_cache = None
+
+def estilos_orcamento():
+    # Os estilos não mudam entre orçamentos, então são montados uma única vez
+    global _estilos_cache
+    if _estilos_cache is not None:
+        return _estilos_cache
 
-    pdf = SimpleDocTemplate(nome_arquivo, pagesize=A4)
-    elementos = []
     estilos_base = getSampleStyleSheet()
+    _estilos_cache = {
+        "titulo": ParagraphStyle(
+            'Titulo',
+            parent=estilos_base['Normal'],
+            fontSize=16,
+            leading=18,
+            alignment=TA_LEFT,
+            spaceAfter=4,
+            fontName='IntroRust',
+        ),
+        "texto": ParagraphStyle(
+            'Texto',
+            parent=estilos_base['Normal'],
+            fontSize=12,
+            leading=14,
+            alignment=TA_LEFT,
+            spaceAfter=2,
+        ),
+        "descricao": ParagraphStyle(
+            'Descricao',
+            parent=estilos_base['Normal'],
+            fontSize=10,
+            leading=12,
+            alignment=TA_CENTER,
+            spaceAfter=0,
+            spaceBefore=0,
+        ),
+        "total_valor": ParagraphStyle(
+            'TotalValor',
+            parent=estilos_base['Normal'],
+            fontSize=12,
+            leading=14,
+            alignment=TA_CENTER,
+            fontName='Helvetica-Bold',
+            textColor=colors.black,
+        ),
+        "total_texto": ParagraphStyle(
+            'TotalTexto',
+            parent=estilos_base['Normal'],
+            fontSize=12,
+            leading=14,
+            alignment=TA_RIGHT,
+            fontName='Helvetica-Bold',
+            textColor=colors.black,
+        ),
+        "quadro": ParagraphStyle(
+            'Quadro',
+            fontSize=12,
+            leading=16,
+            alignment=TA_LEFT,
+            spaceAfter=10,
+        ),
+    }
+    return _estilos_cache
 
-    estilo_titulo = ParagraphStyle(
-        'Titulo',
-        parent=estilos_base['Normal'],
-        fontSize=16,
-        leading=18,
-        alignment=TA_LEFT,
-        spaceAfter=4,
-        fontName='IntroRust',
-    )
-    estilo_texto = ParagraphStyle(
-        'Texto',
-        parent=estilos_base['Normal'],
-        fontSize=12,
-        leading=14,
-        alignment=TA_LEFT,
-        spaceAfter=2,
-    )
-    estilo_descricao = ParagraphStyle(
-        'Descricao',
-        parent=estilos_base['Normal'],
-        fontSize=10,
-        leading=12,
-        alignment=TA_CENTER,
-        spaceAfter=0,
-        spaceBefore=0,
-    )
-    estilo_total_valor = ParagraphStyle(
-        'TotalValor',
-        parent=estilos_base['Normal'],
-        fontSize=12,
-        leading=14,
-        alignment=TA_CENTER,
-        fontName='Helvetica-Bold',
-        textColor=colors.black,
-    )
-    estilo_total_texto = ParagraphStyle(
-        'TotalTexto',
-        parent=estilos_base['Normal'],
-        fontSize=12,
-        leading=14,
-        alignment=TA_RIGHT,
-        fontName='Helvetica-Bold',
-        textColor=colors.black,
-    )
+def caminho_logo_pdf():
+    return LOGO_PNG_PATH if os.path.isfile(LOGO_PNG_PATH) else resource_path(os.path.join("img", "logo.png"))
+
+_logo_cache = None
+
+def dados_logo_pdf(config=None):
+    # A logo é lida do disco uma vez e compartilhada por todos os renders até o arquivo mudar.
+    # "caminho_logo" na config fixa a logo de um render (ex.: o PDF de referência dos testes)
+    global _logo_cache
+    caminho = config["caminho_logo"] if config and "caminho_logo" in config else caminho_logo_pdf()
+    if not caminho or not os.path.isfile(caminho):
+        return None
+    chave = (caminho, os.path.getmtime(caminho))
+    if _logo_cache is None or _logo_cache[0] != chave:
+        with open(caminho, "rb") as f:
+            _logo_cache = (chave, f.read())
+    return _logo_cache[1]
+
+# Campos da configuração impressos no cabeçalho de todo orçamento
+CAMPOS_MARCA = ("titulo", "texto1", "texto2", "texto3")
+
+# Cópia do original guardada ao regerar um orçamento (arquivo ou entrada do contêiner)
+SUFIXO_ORIGINAL = ".bak"
+
+def hash_logo(config=None):
+    dados_logo = dados_logo_pdf(config)
+    return hashlib.sha256(dados_logo).hexdigest() if dados_logo is not None else None
+
+def marca_do_config(config):
+    """Identifica a marca (textos do cabeçalho + logo) com que um orçamento é gerado."""
+    marca = {campo: " ".join(config.get(campo, "").split()) for campo in CAMPOS_MARCA}
+    marca["logo"] = hash_logo(config)
+    return json.dumps(marca, sort_keys=True, ensure_ascii=False)
+
+def elementos_cabecalho(cliente_info, config):
+    nome, endereco, numero, data = cliente_info
+    estilos = estilos_orcamento()
+    elementos = []
 
     texto = [
-        Paragraph(config.get("titulo", "Delicatessen trigo de ouro"), estilo_titulo),
-        Paragraph(config.get("texto1", ""), estilo_texto),
-        Paragraph(config.get("texto2", ""), estilo_texto),
-        Paragraph(config.get("texto3", ""), estilo_texto),
+        Paragraph(config.get("titulo", "Delicatessen trigo de ouro"), estilos["titulo"]),
+        Paragraph(config.get("texto1", ""), estilos["texto"]),
+        Paragraph(config.get("texto2", ""), estilos["texto"]),
+        Paragraph(config.get("texto3", ""), estilos["texto"]),
     ]
 
-    caminho_logo = LOGO_PNG_PATH if os.path.isfile(LOGO_PNG_PATH) else resource_path(os.path.join("img", "logo.png"))
-    if os.path.isfile(caminho_logo):
-        imagem_logo = Image(caminho_logo)
+    dados_logo = dados_logo_pdf(config)
+    if dados_logo is not None:
+        imagem_logo = Image(BytesIO(dados_logo))
         largura_desejada = 80
         proporcao = imagem_logo.imageHeight / imagem_logo.imageWidth
         altura_desejada = largura_desejada * proporcao
@@ -191,14 +530,7 @@ def gerar_orcamento_pdf(nome_arquivo, items, cliente_info, config):
     {data_linha}
     """
 
-    estilo_quadro = ParagraphStyle(
-        'Quadro',
-        fontSize=12,
-        leading=16,
-        alignment=TA_LEFT,
-        spaceAfter=10,
-    )
-    paragrafo_quadro = Paragraph(texto_quadro_html, estilo_quadro)
+    paragrafo_quadro = Paragraph(texto_quadro_html, estilos["quadro"])
 
     tabela_quadro = Table([[paragrafo_quadro]], colWidths=[480])
     tabela_quadro.setStyle(TableStyle([
@@ -214,58 +546,50 @@ def gerar_orcamento_pdf(nome_arquivo, items, cliente_info, config):
 
     elementos.append(tabela_quadro)
     elementos.append(Spacer(1, 20))
-
-    cor_cabecalho = HexColor("#ededed")
-    cor_linhas = colors.white
-    estilo_tabela = TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), cor_cabecalho),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
-        ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('ALIGN', (0, 1), (0, -1), 'CENTER'),
-        ('ALIGN', (1, 1), (1, -1), 'CENTER'),
-        ('ALIGN', (2, 1), (2, -1), 'CENTER'),
-        ('ALIGN', (3, 1), (3, -1), 'CENTER'),
-        ('ALIGN', (2, 0), (3, 0), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 12),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
-        ('BACKGROUND', (0, 1), (-1, -1), cor_linhas),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-    ])
-
-    max_linhas_por_tabela = 15
-    total_itens = len(items)
-
-    for start in range(0, total_itens, max_linhas_por_tabela):
-        if start > 0:
-            elementos.append(PageBreak())
-
-        dados = [["Unid.", "DESCRIÇÃO DOS SERVIÇOS", "Valor Unid (R$)", "Total (R$)"]]
-        slice_itens = items[start:start + max_linhas_por_tabela]
-
-        for unid_str, desc, valor_unid_str, total in slice_itens:
-            p_desc = Paragraph(desc, estilo_descricao)
-            dados.append([
-                str(unid_str),
-                p_desc,
-                formatar_valor(float(valor_unid_str)),
-                formatar_valor(total)
-            ])
-
-        linhas_faltando = max_linhas_por_tabela - len(slice_itens)
-        for _ in range(linhas_faltando):
-            dados.append(["", "", "", ""])
-
-        tabela = Table(dados, colWidths=[50, 230, 100, 100])
-        tabela.setStyle(estilo_tabela)
-        elementos.append(tabela)
-        elementos.append(Spacer(1, 10))
-
-    soma_total = sum(total for _, _, _, total in items)
-
-    texto_total_label = Paragraph("Total:", estilo_total_texto)
-    texto_total_valor = Paragraph(f"R$ {formatar_valor(soma_total)}", estilo_total_valor)
+    return elementos
+
+ESTILO_TABELA_ITENS = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), HexColor("#ededed")),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
+    ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('ALIGN', (0, 1), (0, -1), 'CENTER'),
+    ('ALIGN', (1, 1), (1, -1), 'CENTER'),
+    ('ALIGN', (2, 1), (2, -1), 'CENTER'),
+    ('ALIGN', (3, 1), (3, -1), 'CENTER'),
+    ('ALIGN', (2, 0), (3, 0), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 12),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+])
+
+def elementos_tabela_itens(slice_itens):
+    estilos = estilos_orcamento()
+    dados = [["Unid.", "DESCRIÇÃO DOS SERVIÇOS", "Valor Unid (R$)", "Total (R$)"]]
+
+    for unid_str, desc, valor_unid_str, total in slice_itens:
+        p_desc = Paragraph(desc, estilos["descricao"])
+        dados.append([
+            str(unid_str),
+            p_desc,
+            formatar_valor(float(valor_unid_str)),
+            formatar_valor(total)
+        ])
+
+    linhas_faltando = MAX_LINHAS_POR_TABELA - len(slice_itens)
+    for _ in range(linhas_faltando):
+        dados.append(["", "", "", ""])
+
+    tabela = Table(dados, colWidths=[50, 230, 100, 100])
+    tabela.setStyle(ESTILO_TABELA_ITENS)
+    return [tabela, Spacer(1, 10)]
+
+def elementos_total(soma_total):
+    estilos = estilos_orcamento()
+    texto_total_label = Paragraph("Total:", estilos["total_texto"])
+    texto_total_valor = Paragraph(f"R$ {formatar_valor(soma_total)}", estilos["total_valor"])
 
     tabela_total = Table(
         [[texto_total_label, texto_total_valor]],
@@ -287,12 +611,1632 @@ def gerar_orcamento_pdf(nome_arquivo, items, cliente_info, config):
         ('INNERGRID', (0, 0), (-1, -1), 0, colors.white),
     ]))
 
-    elementos.append(Spacer(1, 20))
-    elementos.append(tabela_total)
+    return [Spacer(1, 20), tabela_total]
+
+def total_paginas(items):
+    # Blocos de MAX_LINHAS_POR_TABELA itens; cada bloco ocupa uma ou mais páginas do PDF
+    return max(1, -(-len(items) // MAX_LINHAS_POR_TABELA))
+
+def elementos_pagina(indice, items, cliente_info, config):
+    # Monta só os elementos de um bloco, na mesma ordem de gerar_orcamento_pdf.
+    # Descrições longas quebram em várias linhas e a tabela do bloco pode transbordar
+    # para outras páginas, exatamente como no documento final
+    elementos = []
+    if indice == 0:
+        elementos.extend(elementos_cabecalho(cliente_info, config))
+
+    start = indice * MAX_LINHAS_POR_TABELA
+    slice_itens = items[start:start + MAX_LINHAS_POR_TABELA]
+    if slice_itens:
+        elementos.extend(elementos_tabela_itens(slice_itens))
+
+    if indice == total_paginas(items) - 1:
+        elementos.extend(elementos_total(sum(total for _, _, _, total in items)))
+    return elementos
+
+def documento_orcamento(buffer, cliente_info, config, deterministico=False):
+    # Metadados vêm só do conteúdo; no modo determinístico o ReportLab também fixa
+    # datas e o /ID do arquivo, então o mesmo orçamento sempre gera os mesmos bytes
+    return SimpleDocTemplate(
+        buffer,
+        pagesize=A4,
+        title=f"Orçamento - {cliente_info[0]}" if cliente_info[0] else "Orçamento",
+        author=config.get("titulo", ""),
+        creator=f"Gerador de Orçamentos {CURRENT_VERSION}",
+        invariant=1 if deterministico else 0,
+    )
+
+def gerar_orcamento_pdf_buffer(buffer, items, cliente_info, config, deterministico=False):
+    # Escreve o PDF em qualquer objeto com write() (BytesIO, socket, arquivo aberto)
+    pdf = documento_orcamento(buffer, cliente_info, config, deterministico)
+    elementos = elementos_cabecalho(cliente_info, config)
+
+    for start in range(0, len(items), MAX_LINHAS_POR_TABELA):
+        if start > 0:
+            elementos.append(PageBreak())
+        elementos.extend(elementos_tabela_itens(items[start:start + MAX_LINHAS_POR_TABELA]))
+
+    soma_total = sum(total for _, _, _, total in items)
+    elementos.extend(elementos_total(soma_total))
 
     pdf.build(elementos)
+
+def gerar_orcamento_pdf_bytes(items, cliente_info, config, deterministico=False):
+    buffer = BytesIO()
+    gerar_orcamento_pdf_buffer(buffer, items, cliente_info, config, deterministico)
+    return buffer.getvalue()
+
+def gerar_orcamento_pdf(nome_arquivo, items, cliente_info, config, deterministico=False):
+    dados = gerar_orcamento_pdf_bytes(items, cliente_info, config, deterministico)
+    # Uma única escrita sequencial: evita várias idas e voltas em pastas de rede
+    with open(nome_arquivo, "wb") as f:
+        f.write(dados)
     print(f"PDF '{nome_arquivo}' gerado com sucesso.")
 
+def itens_de_servicos(services):
+    return [
+        (s["quantity"], s["description"], f"{s['unit_price']:.2f}", s["total"])
+        for s in services
+    ]
+
+def renderizar_pagina_preview(indice, items, cliente_info, config):
+    # Renderiza um único bloco do orçamento em memória, sem tocar no disco
+    buffer = BytesIO()
+    pdf = documento_orcamento(buffer, cliente_info, config, deterministico=True)
+    pdf.build(elementos_pagina(indice, items, cliente_info, config))
+    return buffer.getvalue()
+
+def rasterizar_preview(dados_pdf):
+    # Uma imagem por página: um bloco com descrições longas pode ocupar várias
+    buffer = QBuffer()
+    buffer.setData(QByteArray(dados_pdf))
+    buffer.open(QIODevice.OpenModeFlag.ReadOnly)
+
+    documento = QPdfDocument(None)
+    documento.load(buffer)
+    imagens = []
+    for pagina in range(documento.pageCount()):
+        tamanho_pt = documento.pagePointSize(pagina)
+        altura = int(PREVIEW_LARGURA * tamanho_pt.height() / tamanho_pt.width())
+        imagens.append(documento.render(pagina, QSize(PREVIEW_LARGURA, altura)))
+    documento.close()
+    buffer.close()
+    return imagens
+
+# Blocos já renderizados (lista de páginas), compartilhados por todas as abas (a chave depende só do conteúdo)
+_cache_previews = {}
+
+def guardar_preview(chave, imagens):
+    if len(_cache_previews) >= PREVIEW_CACHE_MAX:
+        del _cache_previews[next(iter(_cache_previews))]
+    _cache_previews[chave] = imagens
+
+class MotorPreviewThread(QThread):
+    """Renderiza as pré-visualizações de todas as abas numa única thread."""
+
+    pagina_pronta = pyqtSignal(object, object)
+    pagina_falhou = pyqtSignal(object, str)
+
+    def __init__(self):
+        super().__init__()
+        self.fila = queue.Queue()
+
+    def enviar(self, chave, indice, itens, cliente_info, config):
+        self.fila.put((chave, (indice, itens, cliente_info, dict(config))))
+
+    def parar(self):
+        self.fila.put(None)
+        self.wait()
+
+    def run(self):
+        while True:
+            lote = [self.fila.get()]
+            while True:
+                try:
+                    lote.append(self.fila.get_nowait())
+                except queue.Empty:
+                    break
+
+            # A mesma página pedida várias vezes (ou por duas abas) vira um único render
+            pedidos = {}
+            for pedido in lote:
+                if pedido is None:
+                    return
+                chave, argumentos = pedido
+                pedidos[chave] = argumentos
+
+            for chave, argumentos in pedidos.items():
+                self.renderizar(chave, *argumentos)
+
+    def renderizar(self, chave, indice, itens, cliente_info, config):
+        inicio = time.perf_counter()
+        try:
+            imagens = rasterizar_preview(renderizar_pagina_preview(indice, itens, cliente_info, config))
+        except Exception as e:
+            print(f"Erro ao gerar pré-visualização: {e}")
+            self.pagina_falhou.emit(chave, str(e))
+            return
+        if DEBUG_TEMPOS:
+            print(f"Pré-visualização do bloco {indice + 1} ({len(imagens)} página(s)) em {(time.perf_counter() - inicio) * 1000:.0f} ms")
+        self.pagina_pronta.emit(chave, imagens)
+
+def itens_exemplo(quantidade=60):
+    return [
+        (i % 5 + 1, f"Serviço de exemplo número {i + 1}", f"{10 + i * 1.5:.2f}", (i % 5 + 1) * (10 + i * 1.5))
+        for i in range(quantidade)
+    ]
+
+def benchmark_io(pasta, repeticoes=20):
+    # Compara o caminho antigo (gravar em disco e reler) com a geração em memória
+    config = load_config()
+    itens = itens_exemplo()
+    cliente_info = ("Cliente Benchmark", "Rua de Teste, 1", "10", datetime.now().strftime("%d/%m/%Y"))
+    caminho = os.path.join(pasta, "benchmark_io.pdf")
+
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        # ReportLab aceita tanto um caminho quanto um buffer como destino
+        gerar_orcamento_pdf_buffer(caminho, itens, cliente_info, config)
+        with open(caminho, "rb") as f:
+            f.read()
+    tempo_disco = time.perf_counter() - inicio
+    os.remove(caminho)
+
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        gerar_orcamento_pdf_bytes(itens, cliente_info, config)
+    tempo_memoria = time.perf_counter() - inicio
+
+    print(f"Disco ({pasta}): {tempo_disco / repeticoes * 1000:.1f} ms por PDF")
+    print(f"Memória: {tempo_memoria / repeticoes * 1000:.1f} ms por PDF")
+    return tempo_disco, tempo_memoria
+
+ARQUIVO_REFERENCIA = os.path.join("tests", "dados", "orcamento_referencia.pdf")
+
+def entrada_referencia():
+    # Orçamento fixo do PDF de referência: não depende da configuração nem da logo do usuário
+    config = {
+        "titulo": "Empresa de Referência",
+        "texto1": "(00) 0000-0000",
+        "texto2": "Rua de Teste, 1",
+        "texto3": "CNPJ: 00.000.000/0001-00",
+        "caminho_logo": resource_path(os.path.join("img", "logo.png")),
+    }
+    cliente_info = ("Cliente Referência", "Rua de Teste, 1", "10", "01/01/2024")
+    return itens_exemplo(30), cliente_info, config
+
+def verificar_determinismo(referencia=ARQUIVO_REFERENCIA, repeticoes=10):
+    itens, cliente_info, config = entrada_referencia()
+
+    resumos = {}
+    tempos = {}
+    for deterministico in (False, True):
+        inicio = time.perf_counter()
+        resumos[deterministico] = {
+            hashlib.sha256(gerar_orcamento_pdf_bytes(itens, cliente_info, config, deterministico)).hexdigest()
+            for _ in range(repeticoes)
+        }
+        tempos[deterministico] = (time.perf_counter() - inicio) / repeticoes
+    dados = gerar_orcamento_pdf_bytes(itens, cliente_info, config, deterministico=True)
+
+    # Um processo novo (outra semente de hash, fontes registradas de novo) precisa chegar aos mesmos bytes
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+        dados_outro_processo = executor.submit(gerar_orcamento_pdf_bytes, itens, cliente_info, config, True).result()
+
+    print(f"Modo normal: {len(resumos[False])} resultado(s) distinto(s) em {repeticoes} renders, "
+          f"{tempos[False] * 1000:.1f} ms por PDF")
+    print(f"Modo determinístico: {len(resumos[True])} resultado(s) distinto(s) em {repeticoes} renders, "
+          f"{tempos[True] * 1000:.1f} ms por PDF")
+    print(f"Outro processo: {'idêntico' if dados_outro_processo == dados else 'DIFERENTE'}")
+    ok = len(resumos[True]) == 1 and dados_outro_processo == dados
+
+    if not os.path.isfile(referencia):
+        print(f"Referência {referencia} não encontrada")
+        return False
+    with open(referencia, "rb") as f:
+        igual = f.read() == dados
+    print(f"Referência {referencia}: {'idêntica' if igual else 'DIFERENTE'}")
+    return ok and igual
+
+
+# --- Diário de recuperação (autosave) ---
+class DiarioOrcamento:
+    """Log só de acréscimo com as alterações do orçamento em edição.
+
+    Cada alteração vira uma linha JSON; de tempos em tempos o log é reescrito
+    em segundo plano como um único snapshot do estado atual.
+    """
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self.lock = threading.Lock()
+        self.registros = self.contar_registros()
+        self.arquivo = open(caminho, "a", encoding="utf-8")
+        self.pendentes = None
+        self.thread_compactacao = None
+
+    def contar_registros(self):
+        if not os.path.isfile(self.caminho):
+            return 0
+        with open(self.caminho, "rb") as f:
+            return sum(1 for _ in f)
+
+    @staticmethod
+    def ler(caminho):
+        estado = {"servicos": [], "cliente": {}, "finalizado": False}
+        if not os.path.isfile(caminho):
+            return estado
+        with open(caminho, "r", encoding="utf-8") as f:
+            for linha in f:
+                try:
+                    registro = json.loads(linha)
+                except ValueError:
+                    # Última linha cortada por um fechamento abrupto
+                    continue
+                DiarioOrcamento.aplicar(estado, registro)
+        return estado
+
+    @staticmethod
+    def aplicar(estado, registro):
+        op = registro.get("op")
+        # "finalizado" = PDF gravado; qualquer alteração depois disso volta a deixar o orçamento em aberto
+        estado["finalizado"] = op == "finalizado"
+        if op == "snapshot":
+            estado["servicos"] = list(registro["servicos"])
+            estado["cliente"] = dict(registro["cliente"])
+            # Snapshots antigos não têm o campo
+            estado["finalizado"] = registro.get("finalizado", False)
+        elif op == "inserir":
+            pos = registro["pos"]
+            estado["servicos"][pos:pos] = registro["servicos"]
+        elif op == "remover":
+            for linha in sorted(registro["linhas"], reverse=True):
+                if 0 <= linha < len(estado["servicos"]):
+                    del estado["servicos"][linha]
+        elif op == "editar":
+            estado["servicos"][registro["linha"]] = registro["servico"]
+        elif op == "mover":
+            servico = estado["servicos"].pop(registro["de"])
+            estado["servicos"].insert(registro["para"], servico)
+        elif op == "cliente":
+            estado["cliente"][registro["campo"]] = registro["valor"]
+
+    def registrar(self, registro):
+        linha = json.dumps(registro, ensure_ascii=False) + "\n"
+        with self.lock:
+            self.arquivo.write(linha)
+            self.arquivo.flush()
+            self.registros += 1
+            if self.pendentes is not None:
+                self.pendentes.append(linha)
+
+    def precisa_compactar(self):
+        return self.registros >= DIARIO_COMPACTAR_APOS and self.thread_compactacao is None
+
+    def compactar(self, estado):
+        # O estado é capturado aqui; o que for registrado durante a escrita vai para "pendentes"
+        with self.lock:
+            self.pendentes = []
+        snapshot = json.dumps({"op": "snapshot", **estado}, ensure_ascii=False) + "\n"
+        self.thread_compactacao = threading.Thread(target=self.escrever_snapshot, args=(snapshot,), daemon=True)
+        self.thread_compactacao.start()
+
+    def escrever_snapshot(self, snapshot):
+        caminho_tmp = self.caminho + ".tmp"
+        try:
+            with open(caminho_tmp, "w", encoding="utf-8") as f:
+                f.write(snapshot)
+                with self.lock:
+                    f.writelines(self.pendentes)
+                    f.flush()
+                    os.fsync(f.fileno())
+                    self.arquivo.close()
+                    os.replace(caminho_tmp, self.caminho)
+                    self.arquivo = open(self.caminho, "a", encoding="utf-8")
+                    self.registros = 1 + len(self.pendentes)
+                    self.pendentes = None
+        except Exception as e:
+            print(f"Erro ao compactar diário: {e}")
+            with self.lock:
+                self.pendentes = None
+                if self.arquivo.closed:
+                    self.arquivo = open(self.caminho, "a", encoding="utf-8")
+        finally:
+            self.thread_compactacao = None
+
+    def aguardar_compactacao(self):
+        thread = self.thread_compactacao
+        if thread is not None:
+            thread.join()
+
+    def limpar(self):
+        self.aguardar_compactacao()
+        with self.lock:
+            self.arquivo.close()
+            self.arquivo = open(self.caminho, "w", encoding="utf-8")
+            self.registros = 0
+
+    def fechar(self):
+        self.aguardar_compactacao()
+        with self.lock:
+            self.arquivo.close()
+
+
+def caminho_diario(numero):
+    # Cada aba tem o seu diário; a primeira continua usando o arquivo de sempre
+    if numero == 1:
+        return DIARIO_FILE
+    raiz, extensao = os.path.splitext(DIARIO_FILE)
+    return f"{raiz}.{numero}{extensao}"
+
+def diarios_existentes():
+    pasta, nome = os.path.split(DIARIO_FILE)
+    raiz, extensao = os.path.splitext(nome)
+    padrao = re.compile(re.escape(raiz) + r"(?:\.(\d+))?" + re.escape(extensao))
+    numeros = []
+    for arquivo in os.listdir(pasta):
+        encontrado = padrao.fullmatch(arquivo)
+        if encontrado:
+            numeros.append(int(encontrado.group(1) or 1))
+    return sorted(numeros)
+
+
+# --- Desfazer / refazer ---
+# Cada comando guarda só a diferença que aplicou, não uma cópia da lista inteira
+class ComandoInserirServicos:
+    def __init__(self, pos, servicos):
+        self.pos = pos
+        self.servicos = servicos
+
+    def aplicar(self, editor):
+        editor.insert_services(self.pos, self.servicos)
+
+    def desfazer(self, editor):
+        editor.delete_services(range(self.pos, self.pos + len(self.servicos)))
+
+class ComandoRemoverServicos:
+    def __init__(self, linhas):
+        self.linhas = sorted(linhas)
+        self.removidos = []
+
+    def aplicar(self, editor):
+        self.removidos = editor.delete_services(self.linhas)
+
+    def desfazer(self, editor):
+        # Reinsere em ordem crescente para cada serviço voltar à posição original;
+        # linhas seguidas voltam juntas, numa única inserção (tabela, diário e total uma vez por trecho)
+        trechos = []
+        for linha, servico in self.removidos:
+            if trechos and trechos[-1][0] + len(trechos[-1][1]) == linha:
+                trechos[-1][1].append(servico)
+            else:
+                trechos.append((linha, [servico]))
+        for linha, servicos in trechos:
+            editor.insert_services(linha, servicos)
+
+class ComandoEditarServico:
+    def __init__(self, linha, antes, depois):
+        self.linha = linha
+        self.antes = antes
+        self.depois = depois
+
+    def aplicar(self, editor):
+        editor.replace_service(self.linha, self.depois)
+
+    def desfazer(self, editor):
+        editor.replace_service(self.linha, self.antes)
+
+class ComandoMoverServico:
+    def __init__(self, de, para):
+        self.de = de
+        self.para = para
+
+    def aplicar(self, editor):
+        editor.move_service(self.de, self.para)
+
+    def desfazer(self, editor):
+        editor.move_service(self.para, self.de)
+
+class PilhaDesfazer:
+    def __init__(self, limite=DESFAZER_MAX):
+        self.desfazer_pilha = deque(maxlen=limite)
+        self.refazer_pilha = []
+
+    def executar(self, comando, editor):
+        comando.aplicar(editor)
+        self.desfazer_pilha.append(comando)
+        self.refazer_pilha.clear()
+
+    def desfazer(self, editor):
+        if not self.desfazer_pilha:
+            return False
+        comando = self.desfazer_pilha.pop()
+        comando.desfazer(editor)
+        self.refazer_pilha.append(comando)
+        return True
+
+    def refazer(self, editor):
+        if not self.refazer_pilha:
+            return False
+        comando = self.refazer_pilha.pop()
+        comando.aplicar(editor)
+        self.desfazer_pilha.append(comando)
+        return True
+
+    def limpar(self):
+        self.desfazer_pilha.clear()
+        self.refazer_pilha.clear()
+
+
+# --- Importação de planilhas ---
+def celula_texto(valor):
+    if valor is None:
+        return ""
+    if isinstance(valor, float):
+        return str(int(valor)) if valor.is_integer() else format(valor, ".15g")
+    return str(valor).strip()
+
+def ler_planilha(caminho):
+    if caminho.lower().endswith(".xlsx"):
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise ValueError("Para importar arquivos .xlsx instale o pacote openpyxl.")
+        planilha = load_workbook(caminho, read_only=True, data_only=True)
+        try:
+            return [[celula_texto(c) for c in linha] for linha in planilha.active.iter_rows(values_only=True)]
+        finally:
+            planilha.close()
+
+    with open(caminho, "r", encoding="utf-8-sig", newline="") as f:
+        amostra = f.read(4096)
+        f.seek(0)
+        try:
+            dialeto = csv.Sniffer().sniff(amostra, delimiters=",;\t")
+        except csv.Error:
+            dialeto = csv.excel
+        return [[celula_texto(c) for c in linha] for linha in csv.reader(f, dialeto)]
+
+def colunas_da_planilha(cabecalho):
+    # Ordem padrão igual à tabela (Qtd., Descrição, Valor Unit.), ajustada pelos nomes do cabeçalho.
+    # Devolve None se nenhum nome de coluna for reconhecido: a linha não é um cabeçalho
+    colunas = {"quantidade": 0, "descricao": 1, "valor": 2}
+    reconhecidas = 0
+    for i, nome in enumerate(c.lower() for c in cabecalho):
+        if nome.startswith(("qtd", "quant", "unid")):
+            colunas["quantidade"] = i
+        elif nome.startswith("desc"):
+            colunas["descricao"] = i
+        elif nome.startswith(("valor", "preço", "preco")):
+            colunas["valor"] = i
+        else:
+            continue
+        reconhecidas += 1
+    return colunas if reconhecidas else None
+
+def validar_planilha(linhas):
+    """Valida todas as linhas de uma vez e devolve (servicos, erros)."""
+    # Linhas em branco são ignoradas, mas cada linha guarda o número que tem na planilha
+    numeradas = [(numero, linha) for numero, linha in enumerate(linhas, start=1) if any(linha)]
+    if not numeradas:
+        return [], []
+    numeros = [numero for numero, _ in numeradas]
+    linhas = [linha for _, linha in numeradas]
+
+    padrao_quantidade = re.compile(REGEX_QUANTIDADE)
+    padrao_valor = re.compile(REGEX_VALOR_UNITARIO)
+
+    colunas = {"quantidade": 0, "descricao": 1, "valor": 2}
+    if not any(padrao_quantidade.fullmatch(c) for c in linhas[0]):
+        cabecalho = colunas_da_planilha(linhas[0])
+        if cabecalho is not None:
+            colunas = cabecalho
+            linhas = linhas[1:]
+            numeros = numeros[1:]
+
+    def coluna(indice):
+        return [linha[indice].strip() if indice < len(linha) else "" for linha in linhas]
+
+    quantidades = coluna(colunas["quantidade"])
+    descricoes = coluna(colunas["descricao"])
+    valores = coluna(colunas["valor"])
+
+    quantidades_ok = [bool(padrao_quantidade.fullmatch(q)) for q in quantidades]
+    valores_ok = [bool(padrao_valor.fullmatch(v)) for v in valores]
+
+    servicos = []
+    erros = []
+    for i, quantidade, descricao, valor, q_ok, v_ok in zip(
+        numeros, quantidades, descricoes, valores, quantidades_ok, valores_ok
+    ):
+        problemas = []
+        if not q_ok:
+            problemas.append("quantidade deve ser um número inteiro positivo")
+        if not v_ok:
+            problemas.append("valor unitário deve ser um número válido")
+        if not descricao:
+            problemas.append("descrição obrigatória")
+        if problemas:
+            erros.append(f"Linha {i}: " + ", ".join(problemas))
+            continue
+
+        quantidade = int(quantidade)
+        valor = float(valor.replace(",", "."))
+        servicos.append({
+            "quantity": quantidade,
+            "description": descricao,
+            "unit_price": valor,
+            "total": quantidade * valor,
+        })
+    return servicos, erros
+
+
+# --- Base de orçamentos e relatórios ---
+def data_iso(data):
+    dia, mes, ano = data.split("/")
+    return f"{ano}-{mes}-{dia}"
+
+class BaseOrcamentos:
+    """Guarda os orçamentos gerados e mantém totais agregados por dia, mês, cliente e serviço.
+
+    Os agregados são atualizados a cada orçamento registrado, então os relatórios
+    nunca precisam percorrer todos os orçamentos.
+    """
+
+    AGRUPAMENTOS = {
+        "dia": "rollup_dia",
+        "mes": "rollup_mes",
+        "cliente": "rollup_cliente",
+        "servico": "rollup_servico",
+    }
+
+    def __init__(self, caminho=DADOS_FILE):
+        self.conexao = sqlite3.connect(caminho, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.conexao:
+            self.conexao.executescript("""
+                CREATE TABLE IF NOT EXISTS orcamentos (
+                    caminho TEXT PRIMARY KEY,
+                    cliente TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    total REAL NOT NULL,
+                    cliente_info TEXT NOT NULL,
+                    itens TEXT NOT NULL,
+                    mtime REAL,
+                    tamanho INTEGER,
+                    marca TEXT
+                );
+                CREATE INDEX IF NOT EXISTS idx_orcamentos_cliente ON orcamentos(cliente);
+                CREATE INDEX IF NOT EXISTS idx_orcamentos_data ON orcamentos(data);
+                CREATE TABLE IF NOT EXISTS rollup_dia (chave TEXT PRIMARY KEY, quantidade INTEGER NOT NULL, total REAL NOT NULL);
+                CREATE TABLE IF NOT EXISTS rollup_mes (chave TEXT PRIMARY KEY, quantidade INTEGER NOT NULL, total REAL NOT NULL);
+                CREATE TABLE IF NOT EXISTS rollup_cliente (chave TEXT PRIMARY KEY, quantidade INTEGER NOT NULL, total REAL NOT NULL);
+                CREATE TABLE IF NOT EXISTS rollup_servico (chave TEXT PRIMARY KEY, quantidade INTEGER NOT NULL, total REAL NOT NULL);
+            """)
+            colunas = {linha[1] for linha in self.conexao.execute("PRAGMA table_info(orcamentos)")}
+            if "marca" not in colunas:
+                # Orçamentos registrados antes disso ficam com a marca desconhecida (NULL)
+                self.conexao.execute("ALTER TABLE orcamentos ADD COLUMN marca TEXT")
+
+    def registrar(self, caminho, cliente_info, itens, mtime=None, tamanho=None, marca=None):
+        self.registrar_varios([(caminho, cliente_info, itens, mtime, tamanho, marca)])
+
+    def registrar_varios(self, registros):
+        # Uma transação para o lote inteiro
+        with self.lock, self.conexao:
+            for caminho, cliente_info, itens, mtime, tamanho, marca in registros:
+                self._registrar(caminho, cliente_info, itens, mtime, tamanho, marca)
+
+    def _registrar(self, caminho, cliente_info, itens, mtime, tamanho, marca):
+        cliente = cliente_info[0].strip() or "(sem nome)"
+        data = data_iso(cliente_info[3])
+        total = sum(item[3] for item in itens)
+        # Reindexar o mesmo arquivo substitui a versão anterior nos agregados
+        self._remover(caminho)
+        self.conexao.execute(
+            "INSERT INTO orcamentos (caminho, cliente, data, total, cliente_info, itens, mtime, tamanho, marca) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (caminho, cliente, data, total, json.dumps(list(cliente_info), ensure_ascii=False),
+             json.dumps([list(item) for item in itens], ensure_ascii=False), mtime, tamanho, marca),
+        )
+        self._atualizar_agregados(cliente, data, total, itens, 1)
+
+    def arquivos_indexados(self, pasta):
+        prefixo = os.path.join(pasta, "")
+        with self.lock:
+            linhas = self.conexao.execute(
+                "SELECT caminho, mtime, tamanho FROM orcamentos WHERE substr(caminho, 1, ?) = ?",
+                (len(prefixo), prefixo),
+            ).fetchall()
+        return {caminho: (mtime, tamanho) for caminho, mtime, tamanho in linhas}
+
+    def _filtro_desatualizados(self, incluir_sem_marca):
+        # Marca desconhecida (NULL) só entra quando pedido: não há como saber se está desatualizada
+        return "marca IS NULL OR marca != ?" if incluir_sem_marca else "marca != ?"
+
+    def desatualizados(self, marca, incluir_sem_marca=False):
+        # Gerados com outra marca (e, se pedido, com marca desconhecida)
+        with self.lock:
+            linhas = self.conexao.execute(
+                "SELECT caminho, cliente_info, itens FROM orcamentos "
+                f"WHERE {self._filtro_desatualizados(incluir_sem_marca)} ORDER BY caminho",
+                (marca,),
+            ).fetchall()
+        return [
+            (caminho, tuple(json.loads(cliente_info)), [tuple(item) for item in json.loads(itens)])
+            for caminho, cliente_info, itens in linhas
+        ]
+
+    def contar_desatualizados(self, marca, incluir_sem_marca=False):
+        with self.lock:
+            return self.conexao.execute(
+                f"SELECT COUNT(*) FROM orcamentos WHERE {self._filtro_desatualizados(incluir_sem_marca)}", (marca,)
+            ).fetchone()[0]
+
+    def atualizar_marca(self, marca, registros):
+        # (caminho, mtime, tamanho) de arquivos regravados: o conteúdo é o mesmo, os agregados não mudam
+        with self.lock, self.conexao:
+            self.conexao.executemany(
+                "UPDATE orcamentos SET marca = ?, mtime = ?, tamanho = ? WHERE caminho = ?",
+                [(marca, mtime, tamanho, caminho) for caminho, mtime, tamanho in registros],
+            )
+
+    def buscar(self, texto, limite=100):
+        padrao = f"%{texto}%"
+        with self.lock:
+            return self.conexao.execute(
+                "SELECT caminho, cliente, data, total FROM orcamentos "
+                "WHERE cliente LIKE ? OR itens LIKE ? OR cliente_info LIKE ? ORDER BY data DESC LIMIT ?",
+                (padrao, padrao, padrao, limite),
+            ).fetchall()
+
+    def remover(self, *caminhos):
+        with self.lock, self.conexao:
+            for caminho in caminhos:
+                self._remover(caminho)
+
+    def _remover(self, caminho):
+        linha = self.conexao.execute(
+            "SELECT cliente, data, total, itens FROM orcamentos WHERE caminho = ?", (caminho,)
+        ).fetchone()
+        if linha is None:
+            return
+        cliente, data, total, itens = linha
+        self._atualizar_agregados(cliente, data, total, json.loads(itens), -1)
+        self.conexao.execute("DELETE FROM orcamentos WHERE caminho = ?", (caminho,))
+
+    def _atualizar_agregados(self, cliente, data, total, itens, sinal):
+        deltas = [
+            ("rollup_dia", data, sinal, sinal * total),
+            ("rollup_mes", data[:7], sinal, sinal * total),
+            ("rollup_cliente", cliente, sinal, sinal * total),
+        ]
+        for quantidade, descricao, _, total_item in itens:
+            deltas.append(("rollup_servico", str(descricao).strip(), sinal * int(quantidade), sinal * total_item))
+
+        for tabela, chave, quantidade, valor in deltas:
+            self.conexao.execute(
+                f"INSERT INTO {tabela} (chave, quantidade, total) VALUES (?, ?, ?) "
+                "ON CONFLICT(chave) DO UPDATE SET quantidade = quantidade + excluded.quantidade, "
+                "total = total + excluded.total",
+                (chave, quantidade, valor),
+            )
+            self.conexao.execute(f"DELETE FROM {tabela} WHERE chave = ? AND quantidade <= 0", (chave,))
+
+    def agregados(self, agrupamento, limite=None):
+        tabela = self.AGRUPAMENTOS[agrupamento]
+        # Datas em ordem cronológica (mais recentes por último); clientes e serviços pelo maior total
+        if agrupamento in ("dia", "mes"):
+            consulta = f"SELECT * FROM (SELECT chave, quantidade, total FROM {tabela} ORDER BY chave DESC LIMIT ?) ORDER BY chave"
+        else:
+            consulta = f"SELECT chave, quantidade, total FROM {tabela} ORDER BY total DESC LIMIT ?"
+        with self.lock:
+            return self.conexao.execute(consulta, (limite if limite is not None else -1,)).fetchall()
+
+    def fechar(self):
+        with self.lock:
+            self.conexao.close()
+
+class GraficoBarras(QWidget):
+    def __init__(self):
+        super().__init__()
+        self.dados = []
+        self.setMinimumHeight(220)
+
+    def set_dados(self, dados):
+        self.dados = dados
+        self.update()
+
+    def paintEvent(self, event):
+        if not self.dados:
+            return
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+
+        largura_rotulo = 160
+        largura_valor = 120
+        altura_barra = max(12, min(28, self.height() // len(self.dados) - 6))
+        maior = max(valor for _, valor in self.dados) or 1
+        espaco = self.width() - largura_rotulo - largura_valor - 20
+
+        for i, (rotulo, valor) in enumerate(self.dados):
+            y = i * (altura_barra + 6)
+            painter.setPen(self.palette().color(self.foregroundRole()))
+            painter.drawText(0, y, largura_rotulo - 10, altura_barra,
+                             Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter,
+                             self.fontMetrics().elidedText(rotulo, Qt.TextElideMode.ElideRight, largura_rotulo - 10))
+            largura = int(espaco * valor / maior)
+            painter.fillRect(largura_rotulo, y, max(largura, 1), altura_barra, QColor("#3b82f6"))
+            painter.drawText(largura_rotulo + largura + 8, y, largura_valor, altura_barra,
+                             Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter,
+                             f"R$ {formatar_valor(valor)}")
+        painter.end()
+
+
+# --- Indexação dos PDFs já gerados ---
+CABECALHO_TABELA_PDF = {"Unid.", "DESCRIÇÃO DOS SERVIÇOS", "Valor Unid (R$)", "Total (R$)"}
+PADRAO_VALOR_PDF = re.compile(r"[\d,]+,\d{2}")
+
+def valor_do_pdf(texto):
+    # formatar_valor usa vírgula tanto no milhar quanto nos centavos: "1,234,56"
+    texto = texto.replace("R$", "").strip()
+    return float(texto[:-3].replace(",", "") + "." + texto[-2:])
+
+def interpretar_texto_orcamento(texto):
+    """Reconstrói cliente, itens e total a partir do texto de um PDF de gerar_orcamento_pdf."""
+    linhas = [linha.strip() for linha in texto.splitlines()]
+    i = 0
+    marca = []
+    while i < len(linhas) and not linhas[i].startswith("Nome:"):
+        if linhas[i]:
+            marca.append(linhas[i])
+        i += 1
+    if i == len(linhas):
+        raise ValueError("o arquivo não tem o formato de orçamento deste app")
+
+    nome = linhas[i][len("Nome:"):].strip().rstrip("_").strip()
+    endereco = numero = data = ""
+    for linha in linhas[i + 1:i + 4]:
+        m = re.match(r"Endereço:\s*(.*?)_*\s*Nº\s*(.*?)_*$", linha)
+        if m:
+            endereco, numero = m.group(1).strip(), m.group(2).strip()
+        m = re.match(r"Data:\s*(\d{2}/\d{2}/\d{4})", linha)
+        if m:
+            data = m.group(1)
+
+    itens = []
+    atual = None
+    total = None
+    linhas_restantes = iter(linhas[i + 1:])
+    for linha in linhas_restantes:
+        if not linha or linha in CABECALHO_TABELA_PDF:
+            continue
+        if linha == "Total:":
+            # Valores grandes quebram "R$" e o número em linhas separadas
+            m = PADRAO_VALOR_PDF.search(" ".join(linhas_restantes))
+            if m:
+                total = valor_do_pdf(m.group(0))
+            break
+        if atual is None:
+            if linha.isdigit():
+                atual = {"quantidade": int(linha), "descricao": [], "valor": None}
+        elif PADRAO_VALOR_PDF.fullmatch(linha):
+            if atual["valor"] is None:
+                atual["valor"] = valor_do_pdf(linha)
+            else:
+                itens.append((atual["quantidade"], " ".join(atual["descricao"]),
+                              f"{atual['valor']:.2f}", valor_do_pdf(linha)))
+                atual = None
+        else:
+            atual["descricao"].append(linha)
+
+    if total is None:
+        raise ValueError("total não encontrado")
+    return {"cliente_info": (nome, endereco, numero, data), "itens": itens, "total": total, "marca": marca[:4]}
+
+def extrair_orcamento_pdf(caminho):
+    # Roda nos processos do pool: devolve (dados, erro) para nunca derrubar o lote
+    try:
+        from pypdf import PdfReader
+        texto = "\n".join(pagina.extract_text() or "" for pagina in PdfReader(caminho).pages)
+        return interpretar_texto_orcamento(texto), None
+    except Exception as e:
+        return None, str(e)
+
+def data_do_arquivo(caminho, mtime):
+    m = re.search(r"(\d{2})-(\d{2})-(\d{4})", os.path.basename(caminho))
+    if m:
+        return "/".join(m.groups())
+    return datetime.fromtimestamp(mtime).strftime("%d/%m/%Y")
+
+def indexar_pdfs(pasta, base, workers=None, progresso=None, logo=None):
+    try:
+        import pypdf  # noqa: F401
+    except ImportError:
+        raise RuntimeError("Para indexar PDFs antigos instale o pacote pypdf.")
+
+    inicio = time.perf_counter()
+    encontrados = {}
+    for raiz, _, arquivos in os.walk(pasta):
+        for arquivo in arquivos:
+            if arquivo.lower().endswith(".pdf"):
+                caminho = os.path.join(raiz, arquivo)
+                st = os.stat(caminho)
+                encontrados[caminho] = (st.st_mtime, st.st_size)
+
+    # Reexecuções só leem o que mudou (mtime + tamanho) desde a última indexação
+    conhecidos = base.arquivos_indexados(pasta)
+    pendentes = [c for c, assinatura in encontrados.items() if conhecidos.get(c) != assinatura]
+    # PDFs dentro de contêineres ('AAAA-MM.orcpak#nome.pdf') não aparecem no os.walk e continuam registrados
+    removidos = [c for c in conhecidos if c not in encontrados and CONTEINER_EXTENSAO + "#" not in c]
+    base.remover(*removidos)
+
+    resumo = {
+        "encontrados": len(encontrados), "indexados": 0, "ignorados": len(encontrados) - len(pendentes),
+        "erros": 0, "removidos": len(removidos),
+    }
+    lote = []
+    if pendentes:
+        with pool_processos(workers) as pool:
+            resultados = pool.map(extrair_orcamento_pdf, pendentes, chunksize=max(1, min(32, len(pendentes) // 64)))
+            for n, (caminho, (dados, erro)) in enumerate(zip(pendentes, resultados), start=1):
+                if erro:
+                    resumo["erros"] += 1
+                    print(f"Não foi possível indexar {caminho}: {erro}")
+                else:
+                    mtime, tamanho = encontrados[caminho]
+                    nome, endereco, numero, data = dados["cliente_info"]
+                    cliente_info = (nome, endereco, numero, data or data_do_arquivo(caminho, mtime))
+                    # Os textos do cabeçalho saem do próprio PDF; a logo não dá para conferir, então vale
+                    # a atual (logo = hash_logo(config)) e o orçamento só fica desatualizado quando ela mudar
+                    marca = dict(zip(CAMPOS_MARCA, (" ".join(linha.split()) for linha in dados["marca"])), logo=logo)
+                    lote.append((caminho, cliente_info, dados["itens"], mtime, tamanho,
+                                 json.dumps(marca, sort_keys=True, ensure_ascii=False)))
+                    resumo["indexados"] += 1
+                if len(lote) >= INDEXADOR_LOTE:
+                    base.registrar_varios(lote)
+                    lote = []
+                if progresso:
+                    progresso(n, len(pendentes))
+    if lote:
+        base.registrar_varios(lote)
+
+    resumo["segundos"] = time.perf_counter() - inicio
+    resumo["arquivos_por_segundo"] = len(pendentes) / resumo["segundos"] if resumo["segundos"] else 0.0
+    print(
+        f"Indexação: {resumo['encontrados']} PDF(s), {resumo['indexados']} indexado(s), "
+        f"{resumo['ignorados']} sem alteração, {resumo['erros']} erro(s), {resumo['removidos']} removido(s) "
+        f"em {resumo['segundos']:.2f} s ({resumo['arquivos_por_segundo']:.1f} arquivos/s)"
+    )
+    return resumo
+
+class IndexadorThread(QThread):
+    progresso = pyqtSignal(int, int)
+    concluido = pyqtSignal(object)
+    falhou = pyqtSignal(str)
+
+    def __init__(self, pasta, base, logo=None):
+        super().__init__()
+        self.pasta = pasta
+        self.base = base
+        self.logo = logo
+
+    def run(self):
+        try:
+            resumo = indexar_pdfs(self.pasta, self.base, progresso=self.progresso.emit, logo=self.logo)
+        except Exception as e:
+            self.falhou.emit(str(e))
+            return
+        self.concluido.emit(resumo)
+
+
+# --- Servidor HTTP local de orçamentos ---
+def itens_de_json(itens_json):
+    # Aceita objetos no formato de self.services ou listas [qtd, descrição, valor unitário].
+    # Mesmas regras da interface e da importação de planilhas (REGEX_QUANTIDADE / REGEX_VALOR_UNITARIO)
+    if not isinstance(itens_json, list):
+        raise ValueError("'items' deve ser uma lista")
+    padrao_quantidade = re.compile(REGEX_QUANTIDADE)
+    padrao_valor = re.compile(REGEX_VALOR_UNITARIO)
+    servicos = []
+    for i, item in enumerate(itens_json, start=1):
+        if isinstance(item, dict):
+            quantidade = item.get("quantity", item.get("quantidade"))
+            descricao = item.get("description", item.get("descricao"))
+            valor = item.get("unit_price", item.get("valor_unitario"))
+        elif isinstance(item, (list, tuple)) and len(item) >= 3:
+            quantidade, descricao, valor = item[:3]
+        else:
+            raise ValueError(f"Item {i}: formato inválido")
+
+        # bool é subclasse de int, mas True não é uma quantidade
+        if isinstance(quantidade, bool) or not padrao_quantidade.fullmatch(str(quantidade)):
+            raise ValueError(f"Item {i}: quantidade deve ser um número inteiro positivo")
+        if isinstance(valor, bool) or not padrao_valor.fullmatch(str(valor)):
+            raise ValueError(f"Item {i}: valor unitário deve ser um número válido")
+        if not descricao or not str(descricao).strip():
+            raise ValueError(f"Item {i}: descrição obrigatória")
+
+        quantidade = int(quantidade)
+        valor = float(str(valor).replace(",", "."))
+        try:
+            total = quantidade * valor
+        except OverflowError:
+            total = float("inf")
+        if total == float("inf"):
+            raise ValueError(f"Item {i}: quantidade ou valor unitário grande demais")
+
+        servicos.append({
+            "quantity": quantidade,
+            "description": str(descricao).strip(),
+            "unit_price": valor,
+            "total": total,
+        })
+    return servicos
+
+def cliente_info_de_json(cliente_json):
+    if isinstance(cliente_json, dict):
+        return (
+            str(cliente_json.get("nome", "")),
+            str(cliente_json.get("endereco", "")),
+            str(cliente_json.get("numero", "")),
+            str(cliente_json.get("data", datetime.now().strftime("%d/%m/%Y"))),
+        )
+    if isinstance(cliente_json, (list, tuple)) and len(cliente_json) == 4:
+        return tuple(str(campo) for campo in cliente_json)
+    raise ValueError("cliente_info deve ser um objeto {nome, endereco, numero, data} ou uma lista com 4 campos")
+
+def percentil(valores, p):
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p / 100))]
+
+class MetricasServidor:
+    def __init__(self, janela=1000):
+        self.lock = threading.Lock()
+        self.latencias = deque(maxlen=janela)
+        self.atendidas = 0
+        self.rejeitadas = 0
+        self.erros = 0
+
+    def registrar(self, latencia_ms):
+        with self.lock:
+            self.atendidas += 1
+            self.latencias.append(latencia_ms)
+
+    def rejeitar(self):
+        with self.lock:
+            self.rejeitadas += 1
+
+    def erro(self):
+        with self.lock:
+            self.erros += 1
+
+    def resumo(self):
+        with self.lock:
+            latencias = list(self.latencias)
+            return {
+                "atendidas": self.atendidas,
+                "rejeitadas": self.rejeitadas,
+                "erros": self.erros,
+                "latencia_p50_ms": round(percentil(latencias, 50), 1),
+                "latencia_p95_ms": round(percentil(latencias, 95), 1),
+                "latencia_max_ms": round(max(latencias, default=0.0), 1),
+            }
+
+class OrcamentoRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/metricas":
+            self.responder_json(200, self.server.metricas.resumo())
+        else:
+            self.responder_json(404, {"erro": "Rota não encontrada"})
+
+    def do_POST(self):
+        if self.path != "/orcamento":
+            self.responder_json(404, {"erro": "Rota não encontrada"})
+            return
+
+        inicio = time.perf_counter()
+        # Fila limitada: sem vaga, o cliente recebe 429 em vez de esperar indefinidamente
+        if not self.server.vagas.acquire(blocking=False):
+            self.server.metricas.rejeitar()
+            self.responder_json(429, {"erro": "Servidor ocupado, tente novamente"}, {"Retry-After": "1"})
+            return
+
+        try:
+            # Sem um tamanho válido o corpo não pode ser lido: read(-1) esperaria o cliente desconectar
+            try:
+                tamanho = int(self.headers["Content-Length"])
+                if tamanho < 0:
+                    raise ValueError
+            except (TypeError, ValueError):
+                self.responder_json(400, {"erro": "Content-Length ausente ou inválido"})
+                return
+            if tamanho > SERVIDOR_CORPO_MAX:
+                self.responder_json(413, {"erro": "Requisição muito grande"})
+                return
+            try:
+                payload = json.loads(self.rfile.read(tamanho) or b"{}")
+                if not isinstance(payload, dict):
+                    raise ValueError("O corpo deve ser um objeto JSON")
+                cliente_info = cliente_info_de_json(payload.get("cliente_info", {}))
+                itens = itens_de_servicos(itens_de_json(payload.get("items", [])))
+                if not itens:
+                    raise ValueError("Adicione pelo menos um serviço")
+            except (ValueError, AttributeError, TypeError, OverflowError) as e:
+                self.responder_json(400, {"erro": str(e)})
+                return
+
+            try:
+                futuro = self.server.executor.submit(gerar_orcamento_pdf_bytes, itens, cliente_info, self.server.config)
+                dados = futuro.result()
+            except Exception as e:
+                self.server.metricas.erro()
+                self.responder_json(500, {"erro": f"Erro ao gerar o PDF: {e}"})
+                return
+
+            latencia_ms = (time.perf_counter() - inicio) * 1000
+            self.server.metricas.registrar(latencia_ms)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/pdf")
+            self.send_header("Content-Length", str(len(dados)))
+            self.send_header("X-Latencia-ms", f"{latencia_ms:.1f}")
+            self.end_headers()
+            self.wfile.write(dados)
+        finally:
+            self.server.vagas.release()
+
+    def responder_json(self, status, corpo, cabecalhos=None):
+        dados = json.dumps(corpo, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(dados)))
+        for chave, valor in (cabecalhos or {}).items():
+            self.send_header(chave, valor)
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def log_message(self, format, *args):
+        print(f"[servidor] {self.address_string()} - {format % args}")
+
+def iniciar_servidor(host=SERVIDOR_HOST, porta=SERVIDOR_PORTA, workers=SERVIDOR_WORKERS, fila_max=SERVIDOR_FILA_MAX):
+    servidor = ThreadingHTTPServer((host, porta), OrcamentoRequestHandler)
+    servidor.daemon_threads = True
+    servidor.config = load_config()
+    servidor.metricas = MetricasServidor()
+    # Renders em processos separados: o ReportLab é Python puro e ficaria preso ao GIL
+    servidor.executor = ProcessPoolExecutor(max_workers=workers)
+    servidor.vagas = threading.BoundedSemaphore(workers + fila_max)
+
+    print(f"Servidor de orçamentos em http://{host}:{porta} ({workers} workers, fila de {fila_max})")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+        servidor.executor.shutdown()
+        print(f"Métricas finais: {servidor.metricas.resumo()}")
+
+def teste_carga(url, requisicoes=200, concorrencia=16):
+    corpo = json.dumps({
+        "cliente_info": {"nome": "Cliente Teste", "endereco": "Rua de Teste, 1", "numero": "10"},
+        "items": [list(item[:3]) for item in itens_exemplo(30)],
+    }).encode("utf-8")
+
+    def enviar(_):
+        requisicao = urllib.request.Request(url, data=corpo, headers={"Content-Type": "application/json"})
+        inicio = time.perf_counter()
+        try:
+            with urllib.request.urlopen(requisicao) as resposta:
+                resposta.read()
+                status = resposta.status
+        except urllib.error.HTTPError as e:
+            status = e.code
+        except Exception:
+            status = None
+        return status, (time.perf_counter() - inicio) * 1000
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concorrencia) as pool:
+        resultados = list(pool.map(enviar, range(requisicoes)))
+    duracao = time.perf_counter() - inicio
+
+    latencias_ok = [ms for status, ms in resultados if status == 200]
+    rejeitadas = sum(1 for status, _ in resultados if status == 429)
+    falhas = len(resultados) - len(latencias_ok) - rejeitadas
+    print(f"{requisicoes} requisições em {duracao:.2f} s ({requisicoes / duracao:.1f} req/s)")
+    print(f"OK: {len(latencias_ok)} | 429: {rejeitadas} | falhas: {falhas}")
+    print(f"Latência p50: {percentil(latencias_ok, 50):.1f} ms | p95: {percentil(latencias_ok, 95):.1f} ms")
+
+
+# --- Gravação assíncrona dos PDFs ---
+def nome_seguro(texto, padrao="Orcamento"):
+    # Remove caracteres que o Windows não aceita em nomes de arquivo/pasta
+    limpo = re.sub(r'[<>:"/\\|?*\x00-\x1f]', "", texto or "").strip().rstrip(". ")
+    return limpo or padrao
+
+def pasta_do_layout(pasta_base, layout, cliente_info):
+    nome, _, _, data = cliente_info
+    dia, mes, ano = data.split("/")
+    relativo = layout.format(
+        data=data.replace("/", "-"), dia=dia, mes=mes, ano=ano, cliente=nome_seguro(nome),
+    )
+    partes = [nome_seguro(parte, "_") for parte in re.split(r"[\\/]+", relativo) if parte.strip()]
+    return os.path.join(pasta_base, *partes)
+
+class GravadorPdfThread(QThread):
+    arquivo_gravado = pyqtSignal(str, object)
+    erro_gravacao = pyqtSignal(str, object)
+
+    def __init__(self):
+        super().__init__()
+        self.fila = queue.Queue()
+        self.pastas_existentes = set()
+        self.nomes_reservados = set()
+        self.bytes_gravados = 0
+        self.tempo_gravando = 0.0
+
+    def enviar(self, pasta_destino, nome_base, dados, contexto=None):
+        self.fila.put((self.gravar, (pasta_destino, nome_base, dados, contexto)))
+
+    def enviar_para_conteiner(self, caminho_base, nome_base, dados, contexto=None):
+        self.fila.put((self.gravar_conteiner, (caminho_base, nome_base, dados, contexto)))
+
+    def enviar_render(self, futuro, destino, nome_base, contexto=None, conteiner=False):
+        # Os bytes ainda estão sendo gerados no pool: a tarefa espera por eles na ordem da fila
+        funcao = self.gravar_conteiner if conteiner else self.gravar
+        self.fila.put((self.gravar_render, (futuro, funcao, destino, nome_base, contexto)))
+
+    def parar(self):
+        # Grava o que ainda estiver na fila antes de encerrar
+        self.fila.put(None)
+        self.wait()
+
+    def run(self):
+        while True:
+            lote = [self.fila.get()]
+            while True:
+                try:
+                    lote.append(self.fila.get_nowait())
+                except queue.Empty:
+                    break
+
+            for tarefa in lote:
+                if tarefa is None:
+                    if DEBUG_TEMPOS:
+                        print(self.resumo_throughput())
+                    return
+                funcao, argumentos = tarefa
+                funcao(*argumentos)
+
+    def gravar_render(self, futuro, funcao, destino, nome_base, contexto):
+        try:
+            dados = futuro.result()
+        except Exception as e:
+            print(f"Erro ao gerar o PDF {nome_base}: {e}")
+            self.erro_gravacao.emit(str(e), contexto)
+            return
+        funcao(destino, nome_base, dados, contexto)
+
+    def gravar(self, pasta_destino, nome_base, dados, contexto):
+        inicio = time.perf_counter()
+        try:
+            if pasta_destino not in self.pastas_existentes:
+                os.makedirs(pasta_destino, exist_ok=True)
+                self.pastas_existentes.add(pasta_destino)
+
+            caminho = self.caminho_livre(pasta_destino, nome_base)
+            try:
+                # Grava num temporário da mesma pasta e renomeia: nunca fica um PDF pela metade
+                fd, caminho_tmp = tempfile.mkstemp(dir=pasta_destino, suffix=".tmp")
+                try:
+                    with os.fdopen(fd, "wb") as f:
+                        f.write(dados)
+                        f.flush()
+                        os.fsync(f.fileno())
+                    os.replace(caminho_tmp, caminho)
+                except Exception:
+                    if os.path.exists(caminho_tmp):
+                        os.remove(caminho_tmp)
+                    raise
+            finally:
+                self.nomes_reservados.discard(caminho)
+        except Exception as e:
+            # A pasta pode ter sido apagada por fora; na próxima tentativa ela é recriada
+            self.pastas_existentes.discard(pasta_destino)
+            print(f"Erro ao gravar PDF em {pasta_destino}: {e}")
+            self.erro_gravacao.emit(str(e), contexto)
+            return
+
+        duracao = time.perf_counter() - inicio
+        self.bytes_gravados += len(dados)
+        self.tempo_gravando += duracao
+        if DEBUG_TEMPOS:
+            print(f"PDF '{caminho}' gravado ({len(dados) / 1024:.0f} KB em {duracao * 1000:.0f} ms)")
+        self.arquivo_gravado.emit(caminho, contexto)
+
+    def gravar_conteiner(self, caminho_base, nome_base, dados, contexto):
+        inicio = time.perf_counter()
+        try:
+            conteiner = abrir_conteiner(caminho_base)
+            nome, bytes_novos = conteiner.adicionar(f"{nome_base}.pdf", dados)
+        except Exception as e:
+            descartar_conteiner(caminho_base)
+            print(f"Erro ao gravar PDF no contêiner {caminho_base}: {e}")
+            self.erro_gravacao.emit(str(e), contexto)
+            return
+
+        duracao = time.perf_counter() - inicio
+        self.bytes_gravados += bytes_novos
+        self.tempo_gravando += duracao
+        caminho = f"{conteiner.caminho_dados}#{nome}"
+        if DEBUG_TEMPOS:
+            print(f"PDF '{caminho}' arquivado ({len(dados) / 1024:.0f} KB, {bytes_novos / 1024:.0f} KB novos, {duracao * 1000:.0f} ms)")
+        self.arquivo_gravado.emit(caminho, contexto)
+
+    def caminho_livre(self, pasta_destino, nome_base):
+        # Orçamentos do mesmo cliente no mesmo dia ganham um sufixo em vez de sobrescrever
+        caminho = os.path.join(pasta_destino, f"{nome_base}.pdf")
+        contador = 2
+        while caminho in self.nomes_reservados or os.path.exists(caminho):
+            caminho = os.path.join(pasta_destino, f"{nome_base} ({contador}).pdf")
+            contador += 1
+        self.nomes_reservados.add(caminho)
+        return caminho
+
+    def resumo_throughput(self):
+        if self.tempo_gravando == 0:
+            return "Nenhum PDF gravado."
+        mb = self.bytes_gravados / (1024 * 1024)
+        return f"Gravados {mb:.2f} MB em {self.tempo_gravando:.2f} s ({mb / self.tempo_gravando:.2f} MB/s)"
+
+
+# --- Processamento da logo ---
+def processar_logo(origem, destino_png=LOGO_PNG_PATH, destino_ico=LOGO_ICO_PATH):
+    inicio = time.perf_counter()
+    tamanho_original = os.path.getsize(origem)
+
+    with PilImage.open(origem) as imagem:
+        dimensoes_originais = imagem.size
+        imagem = ImageOps.exif_transpose(imagem).convert("RGBA")
+    imagem.thumbnail((LOGO_LADO_MAX, LOGO_LADO_MAX), PilImage.Resampling.LANCZOS)
+
+    # O ícone precisa ser quadrado: centraliza a logo num fundo transparente
+    lado = max(imagem.size)
+    quadrado = PilImage.new("RGBA", (lado, lado), (0, 0, 0, 0))
+    quadrado.paste(imagem, ((lado - imagem.width) // 2, (lado - imagem.height) // 2))
+
+    # Grava em temporários e renomeia, para um PDF em geração nunca ler a logo pela metade
+    tmp_png = destino_png + ".tmp"
+    tmp_ico = destino_ico + ".tmp"
+    imagem.save(tmp_png, format="PNG", optimize=True)
+    quadrado.save(tmp_ico, format="ICO", sizes=LOGO_ICO_TAMANHOS)
+    os.replace(tmp_png, destino_png)
+    os.replace(tmp_ico, destino_ico)
+
+    tamanho_pdf = len(gerar_orcamento_pdf_bytes(
+        [(1, "Exemplo", "1.00", 1.0)], ("", "", "", datetime.now().strftime("%d/%m/%Y")), load_config()
+    ))
+    return {
+        "dimensoes_originais": dimensoes_originais,
+        "dimensoes": imagem.size,
+        "tamanho_original": tamanho_original,
+        "tamanho_png": os.path.getsize(destino_png),
+        "tamanho_pdf": tamanho_pdf,
+        "segundos": time.perf_counter() - inicio,
+    }
+
+class ProcessadorLogoThread(QThread):
+    concluido = pyqtSignal(object)
+    falhou = pyqtSignal(str)
+
+    def __init__(self, origem):
+        super().__init__()
+        self.origem = origem
+
+    def run(self):
+        try:
+            resumo = processar_logo(self.origem)
+        except Exception as e:
+            self.falhou.emit(str(e))
+            return
+        if DEBUG_TEMPOS:
+            print(
+                f"Logo {resumo['dimensoes_originais']} -> {resumo['dimensoes']} em {resumo['segundos'] * 1000:.0f} ms; "
+                f"arquivo {resumo['tamanho_original'] / 1024:.0f} KB -> PNG {resumo['tamanho_png'] / 1024:.0f} KB; "
+                f"PDF de exemplo com a nova logo: {resumo['tamanho_pdf'] / 1024:.0f} KB"
+            )
+        self.concluido.emit(resumo)
+
+
+# --- Contêineres de PDFs arquivados ---
+PADRAO_INICIO_STREAM = re.compile(rb"(?<!end)stream\r?\n")
+
+def segmentos_pdf(dados):
+    """Divide o PDF em trechos, isolando o conteúdo de cada stream (imagens, fontes, páginas).
+
+    Streams iguais em orçamentos diferentes (a logo, as fontes) viram o mesmo bloco.
+    """
+    segmentos = []
+    inicio = 0
+    for m in PADRAO_INICIO_STREAM.finditer(dados):
+        if m.start() < inicio:
+            # "stream" dentro do conteúdo de um stream que já foi separado
+            continue
+        fim_stream = dados.find(b"endstream", m.end())
+        if fim_stream < 0:
+            break
+        if fim_stream - m.end() < CONTEINER_BLOCO_MIN:
+            continue
+        segmentos.append(dados[inicio:m.end()])
+        segmentos.append(dados[m.end():fim_stream])
+        inicio = fim_stream
+    segmentos.append(dados[inicio:])
+    return [s for s in segmentos if s]
+
+class ConteinerPdf:
+    """Arquivo só de acréscimo com os PDFs de um mês e um índice ao lado.
+
+    O arquivo de dados guarda blocos (comprimidos quando compensa) endereçados
+    pelo SHA-256; o índice diz em que posição está cada bloco e quais blocos
+    formam cada documento. Ler um documento é mapear o arquivo e fatiar os blocos.
+    """
+
+    def __init__(self, caminho_base):
+        self.caminho_dados = caminho_base + CONTEINER_EXTENSAO
+        self.caminho_indice = caminho_base + CONTEINER_INDICE_EXTENSAO
+        self.lock = threading.Lock()
+        self.blocos = {}
+        self.documentos = {}
+        self.carregar_indice()
+
+    def carregar_indice(self):
+        if not os.path.isfile(self.caminho_indice):
+            return
+        with open(self.caminho_indice, "r", encoding="utf-8") as f:
+            for linha in f:
+                try:
+                    registro = json.loads(linha)
+                except ValueError:
+                    continue
+                if "b" in registro:
+                    self.blocos[registro["b"]] = (registro["o"], registro["n"], registro["z"])
+                else:
+                    self.documentos[registro["d"]] = registro["h"]
+
+    def nome_livre(self, nome):
+        base, extensao = os.path.splitext(nome)
+        contador = 2
+        while nome in self.documentos:
+            nome = f"{base} ({contador}){extensao}"
+            contador += 1
+        return nome
+
+    def adicionar(self, nome, dados, substituir=False):
+        # Com substituir=True o nome passa a apontar para a nova versão (a última entrada do índice vale)
+        with self.lock:
+            if not substituir:
+                nome = self.nome_livre(nome)
+            hashes = []
+            novos_indices = {}
+            with open(self.caminho_dados, "ab") as f:
+                for segmento in segmentos_pdf(dados):
+                    chave = hashlib.sha256(segmento).hexdigest()
+                    hashes.append(chave)
+                    if chave in self.blocos or chave in novos_indices:
+                        continue
+                    comprimido = zlib.compress(segmento, 6)
+                    usar_zlib = len(comprimido) < len(segmento)
+                    conteudo = comprimido if usar_zlib else segmento
+                    offset = f.tell()
+                    f.write(conteudo)
+                    novos_indices[chave] = {"b": chave, "o": offset, "n": len(conteudo), "z": int(usar_zlib)}
+                f.flush()
+                os.fsync(f.fileno())
+
+            # Confere no disco que os blocos remontam exatamente o PDF antes de publicá-lo no índice
+            blocos = dict(self.blocos)
+            for registro in novos_indices.values():
+                blocos[registro["b"]] = (registro["o"], registro["n"], registro["z"])
+            if self.montar(hashes, blocos) != dados:
+                raise ValueError(f"o PDF '{nome}' não foi remontado corretamente no contêiner")
+
+            # O índice só é gravado depois dos dados: uma queda no meio nunca aponta para bytes inexistentes
+            with open(self.caminho_indice, "a", encoding="utf-8") as f:
+                for registro in novos_indices.values():
+                    f.write(json.dumps(registro) + "\n")
+                f.write(json.dumps({"d": nome, "h": hashes}, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+            for registro in novos_indices.values():
+                self.blocos[registro["b"]] = (registro["o"], registro["n"], registro["z"])
+            self.documentos[nome] = hashes
+            return nome, sum(r["n"] for r in novos_indices.values())
+
+    def ler(self, nome):
+        with self.lock:
+            if nome not in self.documentos:
+                # Outro processo pode ter arquivado o documento depois que o índice foi lido
+                self.carregar_indice()
+            return self.montar(self.documentos[nome], self.blocos)
+
+    def montar(self, hashes, blocos):
+        with open(self.caminho_dados, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+            partes = []
+            for chave in hashes:
+                offset, tamanho, comprimido = blocos[chave]
+                bloco = mapa[offset:offset + tamanho]
+                partes.append(zlib.decompress(bloco) if comprimido else bloco)
+        return b"".join(partes)
+
+_conteineres_abertos = {}
+_conteineres_lock = threading.Lock()
+
+def abrir_conteiner(caminho_base):
+    # Uma única instância por contêiner no processo: o lock dela ordena as gravações de todas as threads
+    with _conteineres_lock:
+        conteiner = _conteineres_abertos.get(caminho_base)
+        if conteiner is None:
+            os.makedirs(os.path.dirname(caminho_base), exist_ok=True)
+            conteiner = _conteineres_abertos[caminho_base] = ConteinerPdf(caminho_base)
+        return conteiner
+
+def descartar_conteiner(caminho_base):
+    # Depois de um erro o próximo uso relê o índice do disco
+    with _conteineres_lock:
+        _conteineres_abertos.pop(caminho_base, None)
+
+def separar_caminho_conteiner(caminho):
+    caminho_dados, _, nome = caminho.partition("#")
+    if not caminho_dados.endswith(CONTEINER_EXTENSAO) or not nome:
+        raise ValueError(f"Caminho de contêiner inválido: {caminho}")
+    return caminho_dados[:-len(CONTEINER_EXTENSAO)], nome
+
+def ler_pdf_arquivado(caminho):
+    """Lê um PDF pelo caminho normal ou no formato 'AAAA-MM.orcpak#nome.pdf'."""
+    if CONTEINER_EXTENSAO + "#" not in caminho:
+        with open(caminho, "rb") as f:
+            return f.read()
+    caminho_base, nome = separar_caminho_conteiner(caminho)
+    if not os.path.isfile(caminho_base + CONTEINER_EXTENSAO):
+        raise FileNotFoundError(f"Contêiner não encontrado: {caminho_base + CONTEINER_EXTENSAO}")
+    # A instância compartilhada já tem o índice em memória: ler é só mapear o arquivo e fatiar
+    return abrir_conteiner(caminho_base).ler(nome)
+
+
+# --- Atualização da marca nos orçamentos já gerados ---
+def renderizar_para_regravar(tarefa):
+    # Roda nos processos do pool: devolve (dados, erro) para nunca derrubar o lote
+    cliente_info, itens, config, deterministico = tarefa
+    try:
+        return gerar_orcamento_pdf_bytes(itens, cliente_info, config, deterministico), None
+    except Exception as e:
+        return None, str(e)
+
+def regravar_orcamento(caminho, dados):
+    """Troca um orçamento arquivado (arquivo ou 'AAAA-MM.orcpak#nome.pdf') pela nova versão.
+
+    Devolve (mtime, tamanho) do arquivo regravado, ou (None, None) dentro de um contêiner.
+    """
+    if CONTEINER_EXTENSAO + "#" in caminho:
+        caminho_base, nome = separar_caminho_conteiner(caminho)
+        try:
+            conteiner = abrir_conteiner(caminho_base)
+            # O original continua no contêiner como 'nome.pdf.bak' (os blocos são os mesmos, quase não ocupa espaço)
+            if nome + SUFIXO_ORIGINAL not in conteiner.documentos:
+                conteiner.adicionar(nome + SUFIXO_ORIGINAL, conteiner.ler(nome), substituir=True)
+            conteiner.adicionar(nome, dados, substituir=True)
+        except Exception:
+            descartar_conteiner(caminho_base)
+            raise
+        return None, None
+
+    if not os.path.isfile(caminho):
+        raise FileNotFoundError("arquivo não encontrado")
+    # A primeira regravação guarda o PDF original ao lado; as seguintes não a sobrescrevem
+    if not os.path.exists(caminho + SUFIXO_ORIGINAL):
+        shutil.copy2(caminho, caminho + SUFIXO_ORIGINAL)
+    # Mesmo esquema do GravadorPdfThread: temporário na mesma pasta e rename, nunca um PDF pela metade
+    fd, caminho_tmp = tempfile.mkstemp(dir=os.path.dirname(caminho), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(dados)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(caminho_tmp, caminho)
+    except Exception:
+        if os.path.exists(caminho_tmp):
+            os.remove(caminho_tmp)
+        raise
+    st = os.stat(caminho)
+    return st.st_mtime, st.st_size
+
+def regerar_orcamentos(base, config, workers=None, progresso=None, cancelar=None, incluir_sem_marca=False):
+    """Regera só os orçamentos cuja marca registrada difere da atual.
+
+    Orçamentos com marca desconhecida só entram com incluir_sem_marca=True. O PDF
+    original de cada um fica guardado com o sufixo SUFIXO_ORIGINAL. A marca de cada orçamento é atualizada na base logo depois de regravado, então
+    uma execução interrompida continua de onde parou na próxima vez.
+    """
+    inicio = time.perf_counter()
+    marca = marca_do_config(config)
+    pendentes = base.desatualizados(marca, incluir_sem_marca)
+    config_marca = {campo: config[campo] for campo in CAMPOS_MARCA if campo in config}
+
+    resumo = {"pendentes": len(pendentes), "regerados": 0, "erros": 0, "bytes": 0, "interrompido": False}
+    lote = []
+    if pendentes:
+        # Nos contêineres o modo determinístico deixa a nova versão compartilhar blocos com as outras
+        tarefas = [
+            (cliente_info, itens, config_marca, CONTEINER_EXTENSAO + "#" in caminho)
+            for caminho, cliente_info, itens in pendentes
+        ]
+        pool = pool_processos(workers)
+        try:
+            resultados = pool.map(renderizar_para_regravar, tarefas, chunksize=max(1, min(32, len(tarefas) // 64)))
+            for n, ((caminho, _, _), (dados, erro)) in enumerate(zip(pendentes, resultados), start=1):
+                if erro is None:
+                    try:
+                        mtime, tamanho = regravar_orcamento(caminho, dados)
+                    except Exception as e:
+                        erro = str(e)
+                if erro:
+                    resumo["erros"] += 1
+                    print(f"Não foi possível regerar {caminho}: {erro}")
+                else:
+                    lote.append((caminho, mtime, tamanho))
+                    resumo["regerados"] += 1
+                    resumo["bytes"] += len(dados)
+                if len(lote) >= INDEXADOR_LOTE:
+                    base.atualizar_marca(marca, lote)
+                    lote = []
+                if progresso:
+                    progresso(n, len(pendentes))
+                if cancelar is not None and cancelar.is_set():
+                    resumo["interrompido"] = True
+                    break
+        finally:
+            pool.shutdown(cancel_futures=True)
+            if lote:
+                base.atualizar_marca(marca, lote)
+
+    resumo["segundos"] = time.perf_counter() - inicio
+    resumo["arquivos_por_segundo"] = resumo["regerados"] / resumo["segundos"] if resumo["segundos"] else 0.0
+    mb = resumo["bytes"] / (1024 * 1024)
+    print(
+        f"Atualização da marca: {resumo['pendentes']} desatualizado(s), {resumo['regerados']} regerado(s), "
+        f"{resumo['erros']} erro(s){' (interrompida)' if resumo['interrompido'] else ''} "
+        f"em {resumo['segundos']:.2f} s ({resumo['arquivos_por_segundo']:.1f} arquivos/s, "
+        f"{mb / resumo['segundos'] if resumo['segundos'] else 0.0:.2f} MB/s)"
+    )
+    return resumo
+
+class RegeradorThread(QThread):
+    progresso = pyqtSignal(int, int)
+    concluido = pyqtSignal(object)
+    falhou = pyqtSignal(str)
+
+    def __init__(self, base, config):
+        super().__init__()
+        self.base = base
+        self.config = dict(config)
+        self.cancelar = threading.Event()
+
+    def parar(self):
+        self.cancelar.set()
+        self.wait()
+
+    def run(self):
+        try:
+            resumo = regerar_orcamentos(self.base, self.config, progresso=self.progresso.emit, cancelar=self.cancelar)
+        except Exception as e:
+            self.falhou.emit(str(e))
+            return
+        self.concluido.emit(resumo)
+
 
 # --- Código do Launcher integrado ---
 class VersionCheckThread(QThread):
@@ -381,18 +2325,21 @@ class LauncherWindow(QWidget):
         # Permite fundo transparente
         self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
 
+        self.main_window = None
+
         self.init_ui()
         self.center()
 
-        # Aguarda 2 segundos antes de verificar a versão
-        QTimer.singleShot(2000, self.check_version)
+        # A verificação de versão roda em outra thread enquanto a janela principal é montada
+        self.check_version()
+        QTimer.singleShot(0, self.prebuild_main_window)
 
     def init_ui(self):
         vbox = QVBoxLayout()
         vbox.setContentsMargins(0, 0, 0, 0)
         vbox.setSpacing(10)
 
-        self.setStyleSheet("background-color: transparent;")  # <== Adicione esta linha
+        self.setObjectName("launcher")
 
         self.logo_label = QLabel()
         self.logo_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
@@ -407,7 +2354,7 @@ class LauncherWindow(QWidget):
 
         self.status_label = QLabel("Verificando atualizações...")
         self.status_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.status_label.setStyleSheet("color: white; font-size: 14px;")
+        self.status_label.setObjectName("statusLauncher")
         vbox.addWidget(self.status_label)
 
         self.setLayout(vbox)
@@ -453,166 +2400,81 @@ class LauncherWindow(QWidget):
             self.status_label.setText("App atualizado. Abrindo app...")
             self.open_main_and_close()
 
+    def prebuild_main_window(self):
+        # Garante que o splash já foi desenhado antes de ocupar a thread da interface
+        self.repaint()
+        if self.main_window is None:
+            self.main_window = BudgetGenerator()
+
     def open_main_and_close(self):
         # Fecha o launcher e abre a janela principal
         self.close()
-        self.main_window = BudgetGenerator()
+        if self.main_window is None:
+            self.main_window = BudgetGenerator()
         self.main_window.show()
 
 
-class BudgetGenerator(QWidget):
-    def __init__(self):
-        super().__init__()
+_icone_engrenagem = None
 
-        self.config = load_config()
+class AbaOrcamento(QWidget):
+    """Um orçamento em edição. Cada aba guarda só os seus dados e widgets;
+    configuração, logo, estilos, gravação e renders ficam na janela principal."""
 
-        self.setWindowTitle("Gerador de Orçamentos")
+    def __init__(self, janela, numero):
+        super().__init__()
+        self.janela = janela
+        self.numero = numero
+        self.config = janela.config
         self.services = []
-        self.pdf_save_folder = self.config.get("pdf_save_folder", os.path.expanduser("~"))
+
+        # Pré-visualização: o render acontece no motor compartilhado; a aba só espera pela chave pedida
+        self.preview_page = 0
+        self.preview_bloco = None
+        self.preview_chave = None
+        self.preview_pendentes = set()
+        self.preview_timer = QTimer(self)
+        self.preview_timer.setSingleShot(True)
+        self.preview_timer.setInterval(PREVIEW_DEBOUNCE_MS)
+        self.preview_timer.timeout.connect(self.update_preview)
+
+        self.restaurando = False
+        self.diario = DiarioOrcamento(caminho_diario(numero))
+
+        self.pilha_desfazer = PilhaDesfazer()
+        self.atualizando_tabela = False
+        # Conta os registros do diário: diz se o orçamento mudou entre gerar o PDF e a gravação terminar
+        self.alteracoes = 0
+        # Mesma regra de DiarioOrcamento.aplicar: vai para o snapshot quando o diário é compactado
+        self.finalizado = False
 
         self.init_ui()
-        self.update_app_icon()
 
-    def update_app_icon(self):
-        if os.path.isfile(LOGO_ICO_PATH):
-            self.setWindowIcon(QIcon(LOGO_ICO_PATH))
+    def titulo(self):
+        nome = self.client_name_input.text().strip()
+        return nome[:30] if nome else f"Orçamento {self.numero}"
 
-    def center(self):
-        frame_geom = self.frameGeometry()
-        screen = QApplication.primaryScreen()
-        screen_center = screen.availableGeometry().center()
-        frame_geom.moveCenter(screen_center)
-        self.move(frame_geom.topLeft())
+    def tem_conteudo(self):
+        nome, endereco, numero, _ = self.cliente_info()
+        return bool(self.services or nome or endereco or numero)
 
-    def create_gear_icon(self):
-        svg_data = b"""
-        <svg width="24" height="24" viewBox="0 0 24 24" fill="none" stroke="white" stroke-width="2" stroke-linecap="round" stroke-linejoin="round" >
-          <circle cx="12" cy="12" r="3"></circle>
-          <path d="M19.4 15a1.65 1.65 0 0 0 .33 1.82l.06.06a2 2 0 1 1-2.83 2.83l-.06-.06a1.65 1.65 0 0 0-1.82-.33 1.65 1.65 0 0 0-1 1.51V21a2 2 0 1 1-4 0v-.09a1.65 1.65 0 0 0-1-1.51 1.65 1.65 0 0 0-1.82.33l-.06.06a2 2 0 1 1-2.83-2.83l.06-.06a1.65 1.65 0 0 0 .33-1.82 1.65 1.65 0 0 0-1.51-1H3a2 2 0 1 1 0-4h.09a1.65 1.65 0 0 0 1.51-1 1.65 1.65 0 0 0-.33-1.82l-.06-.06a2 2 0 1 1 2.83-2.83l.06.06a1.65 1.65 0 0 0 1.82.33h.09a1.65 1.65 0 0 0 1-1.51V3a2 2 0 1 1 4 0v.09a1.65 1.65 0 0 0 1 1.51h.09a1.65 1.65 0 0 0 1.82-.33l.06-.06a2 2 0 1 1 2.83 2.83l-.06.06a1.65 1.65 0 0 0-.33 1.82v.09a1.65 1.65 0 0 0 1.51 1H21a2 2 0 1 1 0 4h-.09a1.65 1.65 0 0 0-1.51 1z"/>
-        </svg>
-        """
-        pixmap = QPixmap()
-        pixmap.loadFromData(svg_data, "SVG")
-        return QIcon(pixmap)
+    def fechar(self, descartar=False):
+        self.preview_timer.stop()
+        if descartar:
+            self.diario.limpar()
+        self.diario.fechar()
+        if descartar and self.numero != 1 and os.path.exists(self.diario.caminho):
+            os.remove(self.diario.caminho)
 
     def init_ui(self):
-        main_layout = QHBoxLayout()
-        main_layout.setSpacing(0)
-        main_layout.setContentsMargins(0, 0, 0, 0)
-
-        # Navbar estreita
-        self.navbar_widget = QWidget()
-        self.navbar_widget.setFixedWidth(100)  # largura menor
-        self.navbar_widget.setStyleSheet("background-color: #1e293b;")
-
-        self.navbar_layout = QVBoxLayout(self.navbar_widget)
-        self.navbar_layout.setContentsMargins(10, 10, 10, 10)
-        self.navbar_layout.setSpacing(20)
-
-        # Logo menor
-        self.logo_label = QLabel()
-        if os.path.isfile(LOGO_PNG_PATH):
-            pixmap = QPixmap(LOGO_PNG_PATH).scaledToWidth(70, Qt.TransformationMode.SmoothTransformation)
-            self.logo_label.setPixmap(pixmap)
-        self.logo_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.navbar_layout.addWidget(self.logo_label)
-
-        # Botão ícone dólar
-        self.btn_orcamentos = QPushButton()
-        self.btn_orcamentos.setText("$")
-        self.btn_orcamentos.setIconSize(QSize(32, 32))
-        self.btn_orcamentos.setCursor(Qt.CursorShape.PointingHandCursor)
-        self.btn_orcamentos.setStyleSheet("""
-            QPushButton {
-                color: white;
-                background-color: transparent;
-                border: none;
-                font-size: 32px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #334155;
-            }
-            QPushButton:pressed {
-                background-color: #475569;
-            }
-        """)
-
-        # Botão engrenagem SVG para configuração
-        self.btn_config = QPushButton()
-        self.btn_config.setCursor(Qt.CursorShape.PointingHandCursor)
-        self.btn_config.setIcon(self.create_gear_icon())
-        self.btn_config.setIconSize(QSize(32, 32))
-        self.btn_config.setStyleSheet("""
-            QPushButton {
-                background-color: transparent;
-                border: none;
-            }
-            QPushButton:hover {
-                background-color: #334155;
-            }
-            QPushButton:pressed {
-                background-color: #475569;
-            }
-        """)
-
-        self.navbar_layout.addWidget(self.btn_orcamentos)
-        self.navbar_layout.addWidget(self.btn_config)
-        self.navbar_layout.addStretch()
-
-        # Conteúdo principal com duas "telas": orçamento e configurações
-        self.content_widget = QWidget()
-        self.content_layout = QVBoxLayout(self.content_widget)
-        self.content_layout.setSpacing(20)
-        self.content_layout.setContentsMargins(20, 20, 20, 20)
-
-        self.init_orcamento_ui()
-        self.init_config_ui()
-
-        self.content_layout.addWidget(self.orcamento_widget)
-        self.content_layout.addWidget(self.config_widget)
-
-        self.config_widget.hide()
-
-        main_layout.addWidget(self.navbar_widget)
-        main_layout.addWidget(self.content_widget)
-
-        self.setLayout(main_layout)
-        self.resize(1100, 700)
-        self.center()
-
-        self.btn_orcamentos.clicked.connect(self.show_orcamento)
-        self.btn_config.clicked.connect(self.show_config)
-
-    def init_orcamento_ui(self):
-        self.orcamento_widget = QWidget()
-        orcamento_layout = QVBoxLayout(self.orcamento_widget)
+        orcamento_layout = QVBoxLayout(self)
         orcamento_layout.setSpacing(20)
-
-        header_label = QLabel("Gerador de Orçamentos")
-        header_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        header_label.setStyleSheet("font-size: 30px; font-weight: 600; color: #334155;")
-        subheader_label = QLabel("Crie orçamentos profissionais de forma rápida e fácil")
-        subheader_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        subheader_label.setStyleSheet("color: #64748b; font-size: 15px;")
-
-        orcamento_layout.addWidget(header_label)
-        orcamento_layout.addWidget(subheader_label)
+        orcamento_layout.setContentsMargins(0, 10, 0, 0)
 
         cards_layout = QHBoxLayout()
         cards_layout.setSpacing(20)
 
         client_group = QGroupBox("Dados do Cliente")
-        client_group.setStyleSheet("""
-            QGroupBox {
-                font-weight: 600;
-                border: 1px solid #cbd5e1;
-                border-radius: 8px;
-                padding: 10px;
-                background-color: #f9fafb;
-                color: #334155;
-            }
-        """)
+        client_group.setProperty("variante", "card")
         client_form = QFormLayout()
 
         self.client_name_input = QLineEdit()
@@ -642,29 +2504,25 @@ class BudgetGenerator(QWidget):
         client_group.setLayout(client_form)
         cards_layout.addWidget(client_group)
 
+        self.client_name_input.textChanged.connect(lambda *_: self.on_client_changed("nome"))
+        self.client_address_input.textChanged.connect(lambda *_: self.on_client_changed("endereco"))
+        self.client_number_input.textChanged.connect(lambda *_: self.on_client_changed("numero"))
+        self.client_date_input.dateChanged.connect(lambda *_: self.on_client_changed("data"))
+
         service_group = QGroupBox("Adicionar Serviço")
-        service_group.setStyleSheet("""
-            QGroupBox {
-                font-weight: 600;
-                border: 1px solid #cbd5e1;
-                border-radius: 8px;
-                padding: 10px;
-                background-color: #f9fafb;
-                color: #334155;
-            }
-        """)
+        service_group.setProperty("variante", "card")
         service_form = QFormLayout()
 
         quantity_unit_layout = QHBoxLayout()
         self.quantity_input = QLineEdit()
         self.quantity_input.setPlaceholderText("Qtd. Ex: 2")
         self.quantity_input.setMaximumWidth(60)
-        self.quantity_input.setValidator(QRegularExpressionValidator(QRegularExpression(r"[1-9][0-9]*")))
+        self.quantity_input.setValidator(QRegularExpressionValidator(QRegularExpression(REGEX_QUANTIDADE)))
 
         self.unit_price_input = QLineEdit()
         self.unit_price_input.setPlaceholderText("Valor Unit. Ex: 150.00")
         self.unit_price_input.setMaximumWidth(150)
-        regex = QRegularExpression(r"[0-9]+([.,][0-9]{0,2})?")
+        regex = QRegularExpression(REGEX_VALOR_UNITARIO)
         self.unit_price_input.setValidator(QRegularExpressionValidator(regex))
 
         quantity_unit_layout.addWidget(self.quantity_input)
@@ -676,19 +2534,20 @@ class BudgetGenerator(QWidget):
         self.description_input.setAcceptRichText(False)
 
         self.add_service_button = QPushButton("Adicionar Serviço")
-        self.add_service_button.setStyleSheet("""
-            background: qlineargradient(x1:0, y1:0, x2:1, y2:1,
-                                        stop:0 #60a5fa, stop:1 #3b82f6);
-            color: white;
-            padding: 8px;
-            font-weight: 600;
-            border-radius: 6px;
-        """)
+        self.add_service_button.setProperty("variante", "primario")
         self.add_service_button.clicked.connect(self.add_service)
 
+        self.import_services_button = QPushButton("Importar Planilha")
+        self.import_services_button.setProperty("variante", "primario")
+        self.import_services_button.clicked.connect(self.import_services)
+
+        service_buttons_layout = QHBoxLayout()
+        service_buttons_layout.addWidget(self.add_service_button)
+        service_buttons_layout.addWidget(self.import_services_button)
+
         service_form.addRow("Quantidade / Valor Unitário:", quantity_unit_layout)
         service_form.addRow("Descrição:", self.description_input)
-        service_form.addRow(self.add_service_button)
+        service_form.addRow(service_buttons_layout)
 
         service_group.setLayout(service_form)
         cards_layout.addWidget(service_group)
@@ -701,44 +2560,687 @@ class BudgetGenerator(QWidget):
         )
         self.services_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
         self.services_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
-        self.services_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.services_table.setEditTriggers(
+            QAbstractItemView.EditTrigger.DoubleClicked | QAbstractItemView.EditTrigger.EditKeyPressed
+        )
+        self.services_table.itemChanged.connect(self.on_service_item_changed)
         self.services_table.setAlternatingRowColors(True)
 
-        orcamento_layout.addWidget(self.services_table)
+        tabela_preview_layout = QHBoxLayout()
+        tabela_preview_layout.setSpacing(20)
+        tabela_preview_layout.addWidget(self.services_table, 3)
+
+        preview_group = QGroupBox("Pré-visualização")
+        preview_group.setProperty("variante", "card")
+        preview_layout = QVBoxLayout(preview_group)
+
+        self.preview_label = QLabel("A pré-visualização aparece aqui")
+        self.preview_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.preview_label.setMinimumWidth(PREVIEW_LARGURA)
+        self.preview_label.setProperty("variante", "moldura")
+        preview_layout.addWidget(self.preview_label, 1)
+
+        preview_nav_layout = QHBoxLayout()
+        self.preview_prev_btn = QPushButton("<")
+        self.preview_prev_btn.setMaximumWidth(40)
+        self.preview_prev_btn.clicked.connect(lambda: self.schedule_preview(self.preview_page - 1, imediato=True))
+        self.preview_page_label = QLabel("Página 1/1")
+        self.preview_page_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.preview_next_btn = QPushButton(">")
+        self.preview_next_btn.setMaximumWidth(40)
+        self.preview_next_btn.clicked.connect(lambda: self.schedule_preview(self.preview_page + 1, imediato=True))
+        preview_nav_layout.addWidget(self.preview_prev_btn)
+        preview_nav_layout.addWidget(self.preview_page_label, 1)
+        preview_nav_layout.addWidget(self.preview_next_btn)
+        preview_layout.addLayout(preview_nav_layout)
+
+        tabela_preview_layout.addWidget(preview_group, 2)
+        orcamento_layout.addLayout(tabela_preview_layout, 1)
 
         self.remove_service_btn = QPushButton("Remover Serviço Selecionado")
-        self.remove_service_btn.setStyleSheet("""
-            background: qlineargradient(x1:0, y1:0, x2:1, y2:1,
-                                        stop:0 #ef4444, stop:1 #b91c1c);
-            color: white;
-            padding: 8px;
-            font-weight: 600;
-            border-radius: 6px;
-        """)
+        self.remove_service_btn.setProperty("variante", "perigo")
         self.remove_service_btn.clicked.connect(self.remove_service)
-        orcamento_layout.addWidget(self.remove_service_btn, alignment=Qt.AlignmentFlag.AlignRight)
+
+        self.undo_btn = QPushButton("Desfazer")
+        self.undo_btn.clicked.connect(self.undo)
+        self.redo_btn = QPushButton("Refazer")
+        self.redo_btn.clicked.connect(self.redo)
+        self.move_up_btn = QPushButton("▲")
+        self.move_up_btn.setMaximumWidth(40)
+        self.move_up_btn.clicked.connect(lambda: self.move_selected_service(-1))
+        self.move_down_btn = QPushButton("▼")
+        self.move_down_btn.setMaximumWidth(40)
+        self.move_down_btn.clicked.connect(lambda: self.move_selected_service(1))
+
+        table_actions_layout = QHBoxLayout()
+        table_actions_layout.addWidget(self.undo_btn)
+        table_actions_layout.addWidget(self.redo_btn)
+        table_actions_layout.addStretch()
+        table_actions_layout.addWidget(self.move_up_btn)
+        table_actions_layout.addWidget(self.move_down_btn)
+        table_actions_layout.addWidget(self.remove_service_btn)
+        orcamento_layout.addLayout(table_actions_layout)
+
+        QShortcut(QKeySequence.StandardKey.Undo, self, activated=self.undo)
+        QShortcut(QKeySequence.StandardKey.Redo, self, activated=self.redo)
+        self.update_undo_buttons()
 
         total_layout = QHBoxLayout()
         total_layout.addStretch()
         self.total_label = QLabel("Total Geral: R$ 0,00")
-        self.total_label.setStyleSheet("font-weight: 600; font-size: 18px; color: #3b82f6;")
+        self.total_label.setObjectName("totalGeral")
         total_layout.addWidget(self.total_label)
         orcamento_layout.addLayout(total_layout)
 
         generate_pdf_btn = QPushButton("Gerar Orçamento PDF")
-        generate_pdf_btn.setStyleSheet("""
-            background: qlineargradient(x1:0, y1:0, x2:1, y2:1,
-                                        stop:0 #60a5fa, stop:1 #3b82f6);
-            color: white;
-            padding: 12px;
-            font-weight: 600;
-            border-radius: 8px;
-            font-size: 16px;
-            margin-top: 20px;
-        """)
+        generate_pdf_btn.setObjectName("gerarPdf")
+        generate_pdf_btn.setProperty("variante", "primario")
         generate_pdf_btn.clicked.connect(self.generate_pdf)
         orcamento_layout.addWidget(generate_pdf_btn, alignment=Qt.AlignmentFlag.AlignCenter)
 
+    def add_service(self):
+        quantity_text = self.quantity_input.text().strip()
+        unit_price_text = self.unit_price_input.text().strip()
+        description = self.description_input.toPlainText().strip()
+
+        if not quantity_text or not unit_price_text or not description:
+            QMessageBox.warning(self, "Campos obrigatórios", "Preencha todos os campos do serviço")
+            return
+
+        try:
+            quantity = int(quantity_text)
+            if quantity <= 0:
+                raise ValueError
+        except ValueError:
+            QMessageBox.warning(self, "Erro", "Quantidade deve ser um número inteiro positivo")
+            return
+
+        try:
+            unit_price_text = unit_price_text.replace(",", ".")
+            unit_price = float(unit_price_text)
+            if unit_price < 0:
+                raise ValueError
+        except ValueError:
+            QMessageBox.warning(self, "Erro", "Valor Unitário deve ser um número válido")
+            return
+
+        total = quantity * unit_price
+
+        service = {
+            "quantity": quantity,
+            "description": description,
+            "unit_price": unit_price,
+            "total": total,
+        }
+        self.execute_command(ComandoInserirServicos(len(self.services), [service]))
+
+        self.quantity_input.clear()
+        self.unit_price_input.clear()
+        self.description_input.clear()
+
+    def import_services(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Importar serviços", "", "Planilhas (*.csv *.xlsx)")
+        if not path:
+            return
+
+        inicio = time.perf_counter()
+        try:
+            servicos, erros = validar_planilha(ler_planilha(path))
+        except Exception as e:
+            QMessageBox.critical(self, "Erro", f"Erro ao ler a planilha:\n{e}")
+            return
+
+        if erros:
+            mensagem = "\n".join(erros[:IMPORTACAO_MAX_ERROS_EXIBIDOS])
+            if len(erros) > IMPORTACAO_MAX_ERROS_EXIBIDOS:
+                mensagem += f"\n... e mais {len(erros) - IMPORTACAO_MAX_ERROS_EXIBIDOS} erro(s)"
+            if not servicos:
+                QMessageBox.warning(self, "Planilha inválida", mensagem)
+                return
+            resposta = QMessageBox.question(
+                self, "Erros na planilha",
+                f"{len(erros)} linha(s) com erro:\n\n{mensagem}\n\nImportar as {len(servicos)} linha(s) válidas?"
+            )
+            if resposta != QMessageBox.StandardButton.Yes:
+                return
+
+        if not servicos:
+            QMessageBox.information(self, "Aviso", "Nenhum serviço encontrado na planilha.")
+            return
+
+        self.execute_command(ComandoInserirServicos(len(self.services), servicos))
+        if DEBUG_TEMPOS:
+            print(f"{len(servicos)} serviço(s) importado(s) em {(time.perf_counter() - inicio) * 1000:.0f} ms")
+
+    def remove_service(self):
+        selected_rows = set(idx.row() for idx in self.services_table.selectionModel().selectedRows())
+        if not selected_rows:
+            QMessageBox.information(self, "Aviso", "Selecione ao menos um serviço para remover.")
+            return
+
+        self.execute_command(ComandoRemoverServicos(row for row in selected_rows if 0 <= row < len(self.services)))
+
+    def move_selected_service(self, deslocamento):
+        row = self.services_table.currentRow()
+        destino = row + deslocamento
+        if row < 0 or not 0 <= destino < len(self.services):
+            return
+        self.execute_command(ComandoMoverServico(row, destino))
+        self.services_table.selectRow(destino)
+
+    def on_service_item_changed(self, item):
+        if self.atualizando_tabela:
+            return
+
+        row, col = item.row(), item.column()
+        antes = self.services[row]
+        texto = item.text().strip()
+        depois = dict(antes)
+        try:
+            if col == 0:
+                if not re.fullmatch(REGEX_QUANTIDADE, texto):
+                    raise ValueError("Quantidade deve ser um número inteiro positivo")
+                depois["quantity"] = int(texto)
+            elif col == 1:
+                if not texto:
+                    raise ValueError("Descrição obrigatória")
+                depois["description"] = texto
+            elif col == 2:
+                valor = texto.replace("R$", "").strip()
+                if "," in valor:
+                    valor = valor.replace(".", "")
+                if not re.fullmatch(REGEX_VALOR_UNITARIO, valor):
+                    raise ValueError("Valor Unitário deve ser um número válido")
+                depois["unit_price"] = float(valor.replace(",", "."))
+        except ValueError as e:
+            QMessageBox.warning(self, "Erro", str(e))
+            self.fill_table_rows(row, row + 1)
+            return
+
+        depois["total"] = depois["quantity"] * depois["unit_price"]
+        if depois != antes:
+            self.execute_command(ComandoEditarServico(row, antes, depois))
+        else:
+            self.fill_table_rows(row, row + 1)
+
+    def execute_command(self, comando):
+        self.pilha_desfazer.executar(comando, self)
+        self.update_undo_buttons()
+
+    def undo(self):
+        self.pilha_desfazer.desfazer(self)
+        self.update_undo_buttons()
+
+    def redo(self):
+        self.pilha_desfazer.refazer(self)
+        self.update_undo_buttons()
+
+    def update_undo_buttons(self):
+        self.undo_btn.setEnabled(bool(self.pilha_desfazer.desfazer_pilha))
+        self.redo_btn.setEnabled(bool(self.pilha_desfazer.refazer_pilha))
+
+    # Operações básicas na lista de serviços: atualizam só as linhas afetadas da tabela
+    def insert_services(self, pos, servicos):
+        self.services[pos:pos] = servicos
+        self.journal({"op": "inserir", "pos": pos, "servicos": servicos})
+
+        self.services_table.setUpdatesEnabled(False)
+        try:
+            self.services_table.model().insertRows(pos, len(servicos))
+            self.fill_table_rows(pos, pos + len(servicos))
+        finally:
+            self.services_table.setUpdatesEnabled(True)
+        self.on_services_changed(pos)
+
+    def delete_services(self, linhas):
+        removidos = [(linha, self.services[linha]) for linha in sorted(linhas)]
+        if not removidos:
+            return removidos
+
+        self.services_table.setUpdatesEnabled(False)
+        try:
+            for linha, _ in reversed(removidos):
+                del self.services[linha]
+                self.services_table.removeRow(linha)
+        finally:
+            self.services_table.setUpdatesEnabled(True)
+        self.journal({"op": "remover", "linhas": [linha for linha, _ in removidos]})
+        self.on_services_changed(removidos[0][0])
+        return removidos
+
+    def replace_service(self, linha, servico):
+        self.services[linha] = servico
+        self.journal({"op": "editar", "linha": linha, "servico": servico})
+        self.fill_table_rows(linha, linha + 1)
+        self.on_services_changed(linha)
+
+    def move_service(self, de, para):
+        servico = self.services.pop(de)
+        self.services.insert(para, servico)
+        self.journal({"op": "mover", "de": de, "para": para})
+        self.fill_table_rows(min(de, para), max(de, para) + 1)
+        self.on_services_changed(min(de, para))
+
+    def on_services_changed(self, primeira_linha):
+        self.update_total_label()
+        self.schedule_preview(bloco=min(primeira_linha, max(len(self.services) - 1, 0)) // MAX_LINHAS_POR_TABELA)
+
+    def update_services_table(self, bloco_afetado=None):
+        self.services_table.setRowCount(len(self.services))
+        self.fill_table_rows(0, len(self.services))
+
+        self.update_total_label()
+        self.schedule_preview(bloco=bloco_afetado)
+
+    def fill_table_rows(self, inicio, fim):
+        self.atualizando_tabela = True
+        try:
+            for row in range(inicio, fim):
+                service = self.services[row]
+                self.services_table.setItem(row, 0, QTableWidgetItem(str(service["quantity"])))
+                self.services_table.setItem(row, 1, QTableWidgetItem(service["description"]))
+                self.services_table.setItem(row, 2, QTableWidgetItem(formatar_moeda(service["unit_price"])))
+                total_item = QTableWidgetItem(formatar_moeda(service["total"]))
+                total_item.setFlags(total_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
+                self.services_table.setItem(row, 3, total_item)
+        finally:
+            self.atualizando_tabela = False
+
+    def update_total_label(self):
+        total = sum(s["total"] for s in self.services)
+        self.total_label.setText(f"Total Geral: {formatar_moeda(total)}")
+
+    def on_client_changed(self, campo):
+        valores = dict(zip(("nome", "endereco", "numero", "data"), self.cliente_info()))
+        self.journal({"op": "cliente", "campo": campo, "valor": valores[campo]})
+        if campo == "nome":
+            self.janela.update_tab_title(self)
+        self.schedule_preview(0)
+
+    def journal(self, registro):
+        if self.restaurando:
+            return
+        self.alteracoes += 1
+        self.finalizado = registro["op"] == "finalizado"
+        try:
+            self.diario.registrar(registro)
+            if self.diario.precisa_compactar():
+                self.diario.compactar(self.session_state())
+        except Exception as e:
+            print(f"Erro ao registrar no diário: {e}")
+
+    def session_state(self):
+        nome, endereco, numero, data = self.cliente_info()
+        return {
+            "servicos": [dict(s) for s in self.services],
+            "cliente": {"nome": nome, "endereco": endereco, "numero": numero, "data": data},
+            "finalizado": self.finalizado,
+        }
+
+    def mark_finished(self, alteracoes):
+        # Só marca como finalizado se nada mudou desde que o PDF foi gerado
+        if alteracoes == self.alteracoes:
+            self.journal({"op": "finalizado"})
+
+    def restore_state(self, estado):
+        cliente = estado["cliente"]
+        self.restaurando = True
+        try:
+            self.client_name_input.setText(cliente.get("nome", ""))
+            self.client_address_input.setPlainText(cliente.get("endereco", ""))
+            self.client_number_input.setText(cliente.get("numero", ""))
+            if cliente.get("data"):
+                self.client_date_input.setDate(QDate.fromString(cliente["data"], "dd/MM/yyyy"))
+            self.services = estado["servicos"]
+            self.pilha_desfazer.limpar()
+            self.update_services_table(bloco_afetado=0)
+            self.update_undo_buttons()
+        finally:
+            self.restaurando = False
+        self.janela.update_tab_title(self)
+
+    def cliente_info(self):
+        return (
+            self.client_name_input.text().strip(),
+            self.client_address_input.toPlainText().strip(),
+            self.client_number_input.text().strip(),
+            self.client_date_input.date().toString("dd/MM/yyyy"),
+        )
+
+    def schedule_preview(self, pagina=None, imediato=False, bloco=None):
+        # Agrupa edições seguidas em um único render (debounce).
+        # pagina: página do PDF (navegação); bloco: bloco de itens editado, mostrado a partir da 1ª página dele
+        if pagina is not None:
+            self.preview_page = max(0, pagina)
+            self.preview_bloco = None
+        if bloco is not None:
+            self.preview_bloco = bloco
+        if imediato:
+            self.preview_timer.stop()
+            self.update_preview()
+        else:
+            self.preview_timer.start()
+
+    def preview_page_key(self, indice, itens, cliente_info, blocos):
+        start = indice * MAX_LINHAS_POR_TABELA
+        chave = [indice, tuple(itens[start:start + MAX_LINHAS_POR_TABELA])]
+        if indice == 0:
+            caminho_logo = caminho_logo_pdf()
+            logo_mtime = os.path.getmtime(caminho_logo) if os.path.isfile(caminho_logo) else None
+            chave.append((cliente_info, self.config.get("titulo"), self.config.get("texto1"),
+                          self.config.get("texto2"), self.config.get("texto3"), logo_mtime))
+        if indice == blocos - 1:
+            chave.append(sum(total for _, _, _, total in itens))
+        return tuple(chave)
+
+    def update_preview(self):
+        itens = itens_de_servicos(self.services)
+        cliente_info = self.cliente_info()
+        blocos = total_paginas(itens)
+        chaves = [self.preview_page_key(i, itens, cliente_info, blocos) for i in range(blocos)]
+        # O número de páginas de cada bloco vem do render; um bloco ainda não renderizado conta como uma
+        contagens = [len(_cache_previews[chave]) if chave in _cache_previews else 1 for chave in chaves]
+        paginas = sum(contagens)
+        if self.preview_bloco is not None:
+            alvo = min(self.preview_bloco, blocos - 1)
+            self.preview_page = sum(contagens[:alvo])
+            # Vale até os blocos anteriores serem renderizados e a primeira página do bloco ficar exata
+            if all(chave in _cache_previews for chave in chaves[:alvo]):
+                self.preview_bloco = None
+        self.preview_page = min(self.preview_page, paginas - 1)
+
+        bloco, subpagina = 0, self.preview_page
+        while subpagina >= contagens[bloco]:
+            subpagina -= contagens[bloco]
+            bloco += 1
+
+        # "+": ainda há blocos não renderizados, o total pode crescer
+        estimado = any(chave not in _cache_previews for chave in chaves)
+        self.preview_page_label.setText(f"Página {self.preview_page + 1}/{paginas}{'+' if estimado else ''}")
+        self.preview_prev_btn.setEnabled(self.preview_page > 0)
+        self.preview_next_btn.setEnabled(self.preview_page < paginas - 1)
+
+        if QPdfDocument is None:
+            self.preview_label.setText("Pré-visualização indisponível (QtPdf não instalado)")
+            return
+
+        imagens = _cache_previews.get(chaves[bloco])
+        if imagens is not None:
+            self.preview_chave = None
+            self.preview_label.setPixmap(QPixmap.fromImage(imagens[subpagina]))
+        else:
+            # Enquanto o motor renderiza, a imagem anterior continua na tela
+            self.preview_chave = chaves[bloco]
+            self.enviar_preview(chaves[bloco], bloco, itens, cliente_info)
+
+        # Os outros blocos vão para a fila depois do visível, para o total de páginas ficar exato.
+        # Só quando cabem todos no cache; senão um expulsaria o outro sem fim
+        if blocos <= PREVIEW_CACHE_MAX:
+            for i, chave in enumerate(chaves):
+                if chave not in _cache_previews:
+                    self.enviar_preview(chave, i, itens, cliente_info)
+
+    def enviar_preview(self, chave, bloco, itens, cliente_info):
+        if chave not in self.preview_pendentes:
+            self.preview_pendentes.add(chave)
+            self.janela.motor_preview.enviar(chave, bloco, itens, cliente_info, self.config)
+
+    def on_preview_rendered(self, chave, imagens):
+        # Já está no cache: refaz a contagem de páginas e mostra a página pedida
+        if chave in self.preview_pendentes:
+            self.preview_pendentes.discard(chave)
+            if chave == self.preview_chave:
+                self.preview_chave = None
+            self.update_preview()
+
+    def on_preview_failed(self, chave):
+        self.preview_pendentes.discard(chave)
+        if chave == self.preview_chave:
+            self.preview_chave = None
+            self.preview_label.setText("Erro ao gerar pré-visualização")
+
+    def generate_pdf(self):
+        if len(self.services) == 0:
+            QMessageBox.warning(self, "Dados incompletos", "Adicione pelo menos um serviço")
+            return
+
+        cliente_info = self.cliente_info()
+        nome, endereco, numero, data = cliente_info
+        itens = itens_de_servicos(self.services)
+
+        pasta_data = data.replace("/", "-")
+        layout_pastas = self.config.get("layout_pastas", LAYOUT_PASTAS_PADRAO)
+        pasta_destino = pasta_do_layout(self.janela.pdf_save_folder, layout_pastas, cliente_info)
+        nome_base = f"{nome_seguro(nome)}_{pasta_data}"
+
+        # O render roda no pool compartilhado e a gravação (possivelmente numa pasta de rede) no gravador:
+        # nenhuma aba trava enquanto um orçamento grande é gerado.
+        # No contêiner, bytes estáveis fazem o mesmo orçamento salvo de novo ser todo deduplicado
+        modo_conteiner = self.config.get("modo_conteiner", False)
+        futuro = self.janela.pool_render().submit(
+            gerar_orcamento_pdf_bytes, itens, cliente_info, dict(self.config), modo_conteiner
+        )
+        contexto = {
+            "cliente_info": cliente_info, "itens": itens, "marca": marca_do_config(self.config),
+            "aba": self, "alteracoes": self.alteracoes,
+        }
+        if modo_conteiner:
+            _, mes, ano = data.split("/")
+            self.janela.gravador.enviar_render(futuro, os.path.join(self.janela.pdf_save_folder, f"{ano}-{mes}"),
+                                               nome_base, contexto, conteiner=True)
+        else:
+            self.janela.gravador.enviar_render(futuro, pasta_destino, nome_base, contexto)
+
+
+class BudgetGenerator(QWidget):
+    def __init__(self, restaurar_sessao=True):
+        super().__init__()
+        self.restaurar_sessao = restaurar_sessao
+        self.tempo_interativo_ms = None
+
+        self.config = load_config()
+
+        self.setWindowTitle("Gerador de Orçamentos")
+        self.pdf_save_folder = self.config.get("pdf_save_folder", os.path.expanduser("~"))
+
+        # Um único motor de pré-visualização atende todas as abas
+        self.motor_preview = MotorPreviewThread()
+        self.motor_preview.pagina_pronta.connect(self.on_preview_rendered)
+        self.motor_preview.pagina_falhou.connect(self.on_preview_failed)
+        self.motor_preview.start()
+
+        self.gravador = GravadorPdfThread()
+        self.gravador.arquivo_gravado.connect(self.on_pdf_saved)
+        self.gravador.erro_gravacao.connect(self.on_pdf_save_error)
+        self.gravador.start()
+
+        self.base = BaseOrcamentos(DADOS_FILE)
+        self.regerador = None
+        self._pool_render = None
+
+        inicio = time.perf_counter()
+        self.init_ui()
+        self.update_app_icon()
+        if DEBUG_TEMPOS:
+            print(f"Janela principal montada em {(time.perf_counter() - inicio) * 1000:.1f} ms")
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self.tempo_interativo_ms is None:
+            QTimer.singleShot(0, self.on_interactive)
+
+    def on_interactive(self):
+        self.tempo_interativo_ms = (time.perf_counter() - INICIO_PROCESSO) * 1000
+        print(f"Tempo até interativo: {self.tempo_interativo_ms:.0f} ms")
+        if self.restaurar_sessao:
+            self.restore_sessions()
+
+    def update_app_icon(self):
+        if os.path.isfile(LOGO_ICO_PATH):
+            self.setWindowIcon(QIcon(LOGO_ICO_PATH))
+
+    def center(self):
+        frame_geom = self.frameGeometry()
+        screen = QApplication.primaryScreen()
+        screen_center = screen.availableGeometry().center()
+        frame_geom.moveCenter(screen_center)
+        self.move(frame_geom.topLeft())
+
+    def create_gear_icon(self):
+        global _icone_engrenagem
+        if _icone_engrenagem is not None:
+            return _icone_engrenagem
+
+        svg_data = b"""
+        <svg width="24" height="24" viewBox="0 0 24 24" fill="none" stroke="white" stroke-width="2" stroke-linecap="round" stroke-linejoin="round" >
+          <circle cx="12" cy="12" r="3"></circle>
+          <path d="M19.4 15a1.65 1.65 0 0 0 .33 1.82l.06.06a2 2 0 1 1-2.83 2.83l-.06-.06a1.65 1.65 0 0 0-1.82-.33 1.65 1.65 0 0 0-1 1.51V21a2 2 0 1 1-4 0v-.09a1.65 1.65 0 0 0-1-1.51 1.65 1.65 0 0 0-1.82.33l-.06.06a2 2 0 1 1-2.83-2.83l.06-.06a1.65 1.65 0 0 0 .33-1.82 1.65 1.65 0 0 0-1.51-1H3a2 2 0 1 1 0-4h.09a1.65 1.65 0 0 0 1.51-1 1.65 1.65 0 0 0-.33-1.82l-.06-.06a2 2 0 1 1 2.83-2.83l.06.06a1.65 1.65 0 0 0 1.82.33h.09a1.65 1.65 0 0 0 1-1.51V3a2 2 0 1 1 4 0v.09a1.65 1.65 0 0 0 1 1.51h.09a1.65 1.65 0 0 0 1.82-.33l.06-.06a2 2 0 1 1 2.83 2.83l-.06.06a1.65 1.65 0 0 0-.33 1.82v.09a1.65 1.65 0 0 0 1.51 1H21a2 2 0 1 1 0 4h-.09a1.65 1.65 0 0 0-1.51 1z"/>
+        </svg>
+        """
+        pixmap = QPixmap()
+        pixmap.loadFromData(svg_data, "SVG")
+        _icone_engrenagem = QIcon(pixmap)
+        return _icone_engrenagem
+
+    def init_ui(self):
+        main_layout = QHBoxLayout()
+        main_layout.setSpacing(0)
+        main_layout.setContentsMargins(0, 0, 0, 0)
+
+        # Navbar estreita
+        self.navbar_widget = QWidget()
+        self.navbar_widget.setFixedWidth(100)  # largura menor
+        self.navbar_widget.setObjectName("navbar")
+
+        self.navbar_layout = QVBoxLayout(self.navbar_widget)
+        self.navbar_layout.setContentsMargins(10, 10, 10, 10)
+        self.navbar_layout.setSpacing(20)
+
+        # Logo menor
+        self.logo_label = QLabel()
+        if os.path.isfile(LOGO_PNG_PATH):
+            pixmap = QPixmap(LOGO_PNG_PATH).scaledToWidth(70, Qt.TransformationMode.SmoothTransformation)
+            self.logo_label.setPixmap(pixmap)
+        self.logo_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.navbar_layout.addWidget(self.logo_label)
+
+        # Botão ícone dólar
+        self.btn_orcamentos = QPushButton()
+        self.btn_orcamentos.setText("$")
+        self.btn_orcamentos.setIconSize(QSize(32, 32))
+        self.btn_orcamentos.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.btn_orcamentos.setProperty("variante", "navbar")
+
+        # Botão engrenagem SVG para configuração
+        self.btn_config = QPushButton()
+        self.btn_config.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.btn_config.setIcon(self.create_gear_icon())
+        self.btn_config.setIconSize(QSize(32, 32))
+        self.btn_config.setProperty("variante", "navbar")
+
+        # Botão de relatórios
+        self.btn_relatorios = QPushButton("Σ")
+        self.btn_relatorios.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.btn_relatorios.setProperty("variante", "navbar")
+
+        self.navbar_layout.addWidget(self.btn_orcamentos)
+        self.navbar_layout.addWidget(self.btn_relatorios)
+        self.navbar_layout.addWidget(self.btn_config)
+        self.navbar_layout.addStretch()
+
+        # Conteúdo principal com três "telas": orçamento, relatórios e configurações
+        self.content_widget = QWidget()
+        self.content_layout = QVBoxLayout(self.content_widget)
+        self.content_layout.setSpacing(20)
+        self.content_layout.setContentsMargins(20, 20, 20, 20)
+
+        self.init_orcamento_ui()
+        # As telas de configurações e relatórios só são montadas na primeira vez que forem abertas
+        self.config_widget = None
+        self.relatorios_widget = None
+
+        self.content_layout.addWidget(self.orcamento_widget)
+
+        main_layout.addWidget(self.navbar_widget)
+        main_layout.addWidget(self.content_widget)
+
+        self.setLayout(main_layout)
+        self.resize(1100, 700)
+        self.center()
+
+        self.btn_orcamentos.clicked.connect(self.show_orcamento)
+        self.btn_config.clicked.connect(self.show_config)
+        self.btn_relatorios.clicked.connect(self.show_relatorios)
+
+    def init_orcamento_ui(self):
+        self.orcamento_widget = QWidget()
+        orcamento_layout = QVBoxLayout(self.orcamento_widget)
+        orcamento_layout.setSpacing(20)
+
+        header_label = QLabel("Gerador de Orçamentos")
+        header_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        header_label.setObjectName("titulo")
+        subheader_label = QLabel("Crie orçamentos profissionais de forma rápida e fácil")
+        subheader_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        subheader_label.setObjectName("subtitulo")
+
+        orcamento_layout.addWidget(header_label)
+        orcamento_layout.addWidget(subheader_label)
+
+        # Vários orçamentos abertos ao mesmo tempo, cada um numa aba
+        self.tabs = QTabWidget()
+        self.tabs.setTabsClosable(True)
+        self.tabs.setMovable(True)
+        self.tabs.setDocumentMode(True)
+        self.tabs.tabCloseRequested.connect(self.close_tab)
+
+        nova_aba_btn = QPushButton("+")
+        nova_aba_btn.setToolTip("Novo orçamento")
+        nova_aba_btn.setCursor(Qt.CursorShape.PointingHandCursor)
+        nova_aba_btn.clicked.connect(lambda: self.new_tab())
+        self.tabs.setCornerWidget(nova_aba_btn, Qt.Corner.TopRightCorner)
+        QShortcut(QKeySequence.StandardKey.AddTab, self.orcamento_widget, activated=self.new_tab)
+
+        orcamento_layout.addWidget(self.tabs, 1)
+        self.new_tab(1)
+
+    def abas(self):
+        return [self.tabs.widget(i) for i in range(self.tabs.count())]
+
+    def new_tab(self, numero=None):
+        nova = numero is None
+        if nova:
+            em_uso = {aba.numero for aba in self.abas()}
+            numero = next(n for n in range(1, len(em_uso) + 2) if n not in em_uso)
+
+        aba = AbaOrcamento(self, numero)
+        if nova:
+            # Um diário esquecido com esse número não pode se misturar ao orçamento novo
+            aba.diario.limpar()
+        self.tabs.setCurrentIndex(self.tabs.addTab(aba, aba.titulo()))
+        aba.schedule_preview(0)
+        return aba
+
+    def close_tab(self, indice):
+        aba = self.tabs.widget(indice)
+        if aba.tem_conteudo():
+            resposta = QMessageBox.question(
+                self, "Fechar orçamento", f"Descartar o orçamento \"{aba.titulo()}\"?"
+            )
+            if resposta != QMessageBox.StandardButton.Yes:
+                return
+
+        self.tabs.removeTab(indice)
+        aba.fechar(descartar=True)
+        aba.deleteLater()
+        if self.tabs.count() == 0:
+            self.new_tab()
+
+    def update_tab_title(self, aba):
+        indice = self.tabs.indexOf(aba)
+        if indice >= 0:
+            self.tabs.setTabText(indice, aba.titulo())
+
     def init_config_ui(self):
         self.config_widget = QWidget()
         config_layout = QVBoxLayout(self.config_widget)
@@ -746,20 +3248,11 @@ class BudgetGenerator(QWidget):
         config_layout.setContentsMargins(20, 20, 20, 20)
 
         config_title = QLabel("Configurações")
-        config_title.setStyleSheet("font-size: 24px; font-weight: 600; color: #334155;")
+        config_title.setObjectName("tituloConfig")
         config_layout.addWidget(config_title)
 
         textos_group = QGroupBox("Textos do PDF")
-        textos_group.setStyleSheet("""
-            QGroupBox {
-                font-weight: 600;
-                border: 1px solid #cbd5e1;
-                border-radius: 8px;
-                padding: 15px;
-                background-color: #f9fafb;
-                color: #334155;
-            }
-        """)
+        textos_group.setProperty("variante", "card-config")
         textos_layout = QFormLayout(textos_group)
 
         self.input_titulo = QLineEdit()
@@ -781,8 +3274,9 @@ class BudgetGenerator(QWidget):
         config_layout.addWidget(textos_group)
 
         pasta_group = QGroupBox("Pasta para salvar PDFs")
-        pasta_group.setStyleSheet(textos_group.styleSheet())
-        pasta_layout = QHBoxLayout(pasta_group)
+        pasta_group.setProperty("variante", "card-config")
+        pasta_group_layout = QVBoxLayout(pasta_group)
+        pasta_layout = QHBoxLayout()
 
         self.path_input = QLineEdit()
         self.path_input.setText(self.pdf_save_folder)
@@ -792,48 +3286,72 @@ class BudgetGenerator(QWidget):
         btn_browse.setMaximumWidth(150)
         btn_browse.clicked.connect(self.browse_folder)
         pasta_layout.addWidget(btn_browse)
+        pasta_group_layout.addLayout(pasta_layout)
+
+        layout_pastas_form = QFormLayout()
+        self.layout_pastas_input = QLineEdit()
+        self.layout_pastas_input.setText(self.config.get("layout_pastas", LAYOUT_PASTAS_PADRAO))
+        self.layout_pastas_input.setPlaceholderText("Ex: {ano}/{mes}/{data} ou {cliente}")
+        layout_pastas_form.addRow("Subpastas:", self.layout_pastas_input)
+        pasta_group_layout.addLayout(layout_pastas_form)
+
+        self.modo_conteiner_input = QCheckBox("Arquivar em contêineres mensais compactados (em vez de um arquivo por orçamento)")
+        self.modo_conteiner_input.setChecked(self.config.get("modo_conteiner", False))
+        pasta_group_layout.addWidget(self.modo_conteiner_input)
 
         config_layout.addWidget(pasta_group)
 
         logo_group = QGroupBox("Logo do Orçamento")
-        logo_group.setStyleSheet(textos_group.styleSheet())
+        logo_group.setProperty("variante", "card-config")
         logo_layout = QVBoxLayout(logo_group)
 
         self.logo_preview = QLabel()
         self.logo_preview.setFixedSize(160, 100)
         self.logo_preview.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.logo_preview.setStyleSheet("border: 1px solid #cbd5e1; background-color: white;")
+        self.logo_preview.setProperty("variante", "moldura")
         if os.path.isfile(LOGO_PNG_PATH):
             pixmap = QPixmap(LOGO_PNG_PATH).scaled(self.logo_preview.size(), Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
             self.logo_preview.setPixmap(pixmap)
         logo_layout.addWidget(self.logo_preview)
 
-        btn_change_logo = QPushButton("Trocar Logo")
-        btn_change_logo.setMaximumWidth(150)
-        btn_change_logo.setStyleSheet("""
-            background: qlineargradient(x1:0, y1:0, x2:1, y2:1,
-                                        stop:0 #60a5fa, stop:1 #3b82f6);
-            color: white;
-            padding: 8px;
-            font-weight: 600;
-            border-radius: 6px;
-        """)
-        btn_change_logo.clicked.connect(self.change_logo)
-        logo_layout.addWidget(btn_change_logo)
+        self.btn_change_logo = QPushButton("Trocar Logo")
+        self.btn_change_logo.setMaximumWidth(150)
+        self.btn_change_logo.setProperty("variante", "primario")
+        self.btn_change_logo.clicked.connect(self.change_logo)
+        logo_layout.addWidget(self.btn_change_logo)
 
         config_layout.addWidget(logo_group)
 
+        regerar_group = QGroupBox("Orçamentos já gerados")
+        regerar_group.setProperty("variante", "card-config")
+        regerar_layout = QHBoxLayout(regerar_group)
+        self.regerar_status_label = QLabel("Orçamentos antigos mantêm a marca com que foram gerados.")
+        regerar_layout.addWidget(self.regerar_status_label, 1)
+        self.regerar_btn = QPushButton("Atualizar marca")
+        self.regerar_btn.setMaximumWidth(150)
+        self.regerar_btn.setProperty("variante", "primario")
+        self.regerar_btn.clicked.connect(self.offer_rerender)
+        regerar_layout.addWidget(self.regerar_btn)
+
+        config_layout.addWidget(regerar_group)
+
+        tema_group = QGroupBox("Aparência")
+        tema_group.setProperty("variante", "card-config")
+        tema_layout = QFormLayout(tema_group)
+
+        self.tema_input = QComboBox()
+        for nome in TEMAS:
+            self.tema_input.addItem(nome.capitalize(), nome)
+        self.tema_input.setCurrentIndex(max(0, self.tema_input.findData(self.config.get("tema", TEMA_PADRAO))))
+        self.tema_input.currentIndexChanged.connect(lambda *_: aplicar_tema(self.tema_input.currentData()))
+        tema_layout.addRow("Tema:", self.tema_input)
+
+        config_layout.addWidget(tema_group)
+
         btn_save_config = QPushButton("Salvar Configurações")
         btn_save_config.setMaximumWidth(200)
-        btn_save_config.setStyleSheet("""
-            background: qlineargradient(x1:0, y1:0, x2:1, y2:1,
-                                        stop:0 #60a5fa, stop:1 #3b82f6);
-            color: white;
-            padding: 10px;
-            font-weight: 600;
-            border-radius: 6px;
-            margin-top: 20px;
-        """)
+        btn_save_config.setObjectName("salvarConfig")
+        btn_save_config.setProperty("variante", "primario")
         btn_save_config.clicked.connect(self.save_config)
         config_layout.addWidget(btn_save_config, alignment=Qt.AlignmentFlag.AlignCenter)
 
@@ -847,21 +3365,32 @@ class BudgetGenerator(QWidget):
     def change_logo(self):
         path, _ = QFileDialog.getOpenFileName(self, "Selecionar nova logo", "", "Imagens (*.png *.jpg *.jpeg *.bmp *.ico)")
         if path:
-            try:
-                pil_img = PilImage.open(path)
-                pil_img.save(LOGO_PNG_PATH)
-                pil_img.save(LOGO_ICO_PATH)
-
-                pixmap = QPixmap(LOGO_PNG_PATH).scaled(self.logo_preview.size(), Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
-                self.logo_preview.setPixmap(pixmap)
-
-                self.logo_label.setPixmap(pixmap.scaledToWidth(70, Qt.TransformationMode.SmoothTransformation))
-                self.update_app_icon()
+            # Redimensionar e gerar o .ico fica fora da thread da interface
+            self.btn_change_logo.setEnabled(False)
+            self.btn_change_logo.setText("Processando...")
+            self.processador_logo = ProcessadorLogoThread(path)
+            self.processador_logo.concluido.connect(self.on_logo_processed)
+            self.processador_logo.falhou.connect(self.on_logo_failed)
+            self.processador_logo.start()
+
+    def on_logo_processed(self, resumo):
+        self.btn_change_logo.setEnabled(True)
+        self.btn_change_logo.setText("Trocar Logo")
+
+        pixmap = QPixmap(LOGO_PNG_PATH)
+        self.logo_preview.setPixmap(pixmap.scaled(self.logo_preview.size(), Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation))
+        self.logo_label.setPixmap(pixmap.scaledToWidth(70, Qt.TransformationMode.SmoothTransformation))
+        self.update_app_icon()
+        for aba in self.abas():
+            aba.schedule_preview(0)
 
-                QMessageBox.information(self, "Logo Atualizada", "Logo atualizada com sucesso!")
+        QMessageBox.information(self, "Logo Atualizada", "Logo atualizada com sucesso!")
+        self.offer_rerender()
 
-            except Exception as e:
-                QMessageBox.critical(self, "Erro", f"Erro ao atualizar logo:\n{e}")
+    def on_logo_failed(self, mensagem):
+        self.btn_change_logo.setEnabled(True)
+        self.btn_change_logo.setText("Trocar Logo")
+        QMessageBox.critical(self, "Erro", f"Erro ao atualizar logo:\n{mensagem}")
 
     def save_config(self):
         path = self.path_input.text().strip()
@@ -869,172 +3398,379 @@ class BudgetGenerator(QWidget):
             QMessageBox.warning(self, "Pasta inválida", "Selecione uma pasta válida para salvar PDFs.")
             return
 
+        marca_anterior = marca_do_config(self.config)
         self.config["titulo"] = self.input_titulo.text().strip()
         self.config["texto1"] = self.input_texto1.text().strip()
         self.config["texto2"] = self.input_texto2.text().strip()
         self.config["texto3"] = self.input_texto3.text().strip()
         self.config["pdf_save_folder"] = path
 
+        layout_pastas = self.layout_pastas_input.text().strip() or LAYOUT_PASTAS_PADRAO
+        try:
+            pasta_do_layout(path, layout_pastas, ("Cliente", "", "", "01/01/2000"))
+        except (KeyError, ValueError, IndexError):
+            QMessageBox.warning(self, "Subpastas inválidas", "Use apenas {data}, {ano}, {mes}, {dia} e {cliente} na estrutura de subpastas.")
+            return
+        self.config["layout_pastas"] = layout_pastas
+        self.config["tema"] = self.tema_input.currentData()
+        self.config["modo_conteiner"] = self.modo_conteiner_input.isChecked()
+
         try:
             save_config(self.config)
             self.pdf_save_folder = path
+            for aba in self.abas():
+                aba.schedule_preview(0)
             QMessageBox.information(self, "Configurações Salvas", "Configurações atualizadas com sucesso!")
         except Exception as e:
             QMessageBox.critical(self, "Erro", f"Erro ao salvar configurações:\n{e}")
+            return
 
-    def show_orcamento(self):
-        self.config_widget.hide()
-        self.orcamento_widget.show()
-
-    def show_config(self):
-        self.orcamento_widget.hide()
-        self.config_widget.show()
+        if marca_do_config(self.config) != marca_anterior:
+            self.offer_rerender()
 
-    def add_service(self):
-        quantity_text = self.quantity_input.text().strip()
-        unit_price_text = self.unit_price_input.text().strip()
-        description = self.description_input.toPlainText().strip()
-
-        if not quantity_text or not unit_price_text or not description:
-            QMessageBox.warning(self, "Campos obrigatórios", "Preencha todos os campos do serviço")
+    def offer_rerender(self):
+        if self.regerador is not None and self.regerador.isRunning():
             return
-
         try:
-            quantity = int(quantity_text)
-            if quantity <= 0:
-                raise ValueError
-        except ValueError:
-            QMessageBox.warning(self, "Erro", "Quantidade deve ser um número inteiro positivo")
+            quantidade = self.base.contar_desatualizados(marca_do_config(self.config))
+        except Exception as e:
+            QMessageBox.critical(self, "Erro", f"Erro ao consultar orçamentos:\n{e}")
             return
-
-        try:
-            unit_price_text = unit_price_text.replace(",", ".")
-            unit_price = float(unit_price_text)
-            if unit_price < 0:
-                raise ValueError
-        except ValueError:
-            QMessageBox.warning(self, "Erro", "Valor Unitário deve ser um número válido")
+        if quantidade == 0:
+            self.regerar_status_label.setText("Nenhum orçamento registrado usa outra marca.")
             return
 
-        total = quantity * unit_price
-
-        service = {
-            "quantity": quantity,
-            "description": description,
-            "unit_price": unit_price,
-            "total": total,
-        }
-        self.services.append(service)
-
-        self.update_services_table()
-
-        self.quantity_input.clear()
-        self.unit_price_input.clear()
-        self.description_input.clear()
-
-    def remove_service(self):
-        selected_rows = set(idx.row() for idx in self.services_table.selectionModel().selectedRows())
-        if not selected_rows:
-            QMessageBox.information(self, "Aviso", "Selecione ao menos um serviço para remover.")
+        resposta = QMessageBox.question(
+            self, "Atualizar orçamentos",
+            f"{quantidade} orçamento(s) já gerado(s) ainda usam outra marca (textos ou logo).\n"
+            "Deseja regerá-los com a marca atual?"
+        )
+        if resposta != QMessageBox.StandardButton.Yes:
             return
 
-        for row in sorted(selected_rows, reverse=True):
-            if 0 <= row < len(self.services):
-                del self.services[row]
+        self.regerar_btn.setEnabled(False)
+        self.regerar_status_label.setText("Regerando orçamentos...")
+        self.regerador = RegeradorThread(self.base, self.config)
+        self.regerador.progresso.connect(
+            lambda n, total: self.regerar_status_label.setText(f"Regerando {n}/{total}...")
+        )
+        self.regerador.concluido.connect(self.on_rerender_done)
+        self.regerador.falhou.connect(self.on_rerender_failed)
+        self.regerador.start()
+
+    def on_rerender_done(self, resumo):
+        self.regerar_btn.setEnabled(True)
+        texto = (
+            f"{resumo['regerados']} regerado(s), {resumo['erros']} erro(s) — "
+            f"{resumo['arquivos_por_segundo']:.1f} arquivos/s"
+        )
+        if resumo["interrompido"]:
+            texto += " (interrompido, continua na próxima vez)"
+        self.regerar_status_label.setText(texto)
 
-        self.update_services_table()
+    def on_rerender_failed(self, mensagem):
+        self.regerar_btn.setEnabled(True)
+        self.regerar_status_label.setText("")
+        QMessageBox.critical(self, "Erro", f"Erro ao regerar orçamentos:\n{mensagem}")
 
-    def update_services_table(self):
-        self.services_table.setRowCount(len(self.services))
-        for row, service in enumerate(self.services):
-            self.services_table.setItem(row, 0, QTableWidgetItem(str(service["quantity"])))
-            self.services_table.setItem(row, 1, QTableWidgetItem(service["description"]))
-            self.services_table.setItem(row, 2, QTableWidgetItem(self.format_currency(service["unit_price"])))
-            self.services_table.setItem(row, 3, QTableWidgetItem(self.format_currency(service["total"])))
+    def hide_screens(self):
+        for tela in (self.orcamento_widget, self.config_widget, self.relatorios_widget):
+            if tela is not None:
+                tela.hide()
 
-        self.update_total_label()
+    def show_orcamento(self):
+        self.hide_screens()
+        self.orcamento_widget.show()
 
-    def update_total_label(self):
-        total = sum(s["total"] for s in self.services)
-        self.total_label.setText(f"Total Geral: {self.format_currency(total)}")
+    def show_config(self):
+        if self.config_widget is None:
+            self.init_config_ui()
+            self.content_layout.addWidget(self.config_widget)
+        self.hide_screens()
+        self.config_widget.show()
 
-    def generate_pdf(self):
-        nome = self.client_name_input.text().strip()
-        endereco = self.client_address_input.toPlainText().strip()
-        numero = self.client_number_input.text().strip()
-        data = self.client_date_input.date().toString("dd/MM/yyyy")
+    def show_relatorios(self):
+        if self.relatorios_widget is None:
+            self.init_relatorios_ui()
+            self.content_layout.addWidget(self.relatorios_widget)
+        self.hide_screens()
+        self.update_relatorios()
+        self.relatorios_widget.show()
+
+    def init_relatorios_ui(self):
+        self.relatorios_widget = QWidget()
+        relatorios_layout = QVBoxLayout(self.relatorios_widget)
+        relatorios_layout.setSpacing(20)
+        relatorios_layout.setContentsMargins(20, 20, 20, 20)
+
+        relatorios_title = QLabel("Relatórios")
+        relatorios_title.setObjectName("tituloConfig")
+        relatorios_layout.addWidget(relatorios_title)
+
+        agrupamento_layout = QHBoxLayout()
+        agrupamento_layout.addWidget(QLabel("Agrupar por:"))
+        self.agrupamento_input = QComboBox()
+        self.agrupamento_input.addItem("Dia", "dia")
+        self.agrupamento_input.addItem("Mês", "mes")
+        self.agrupamento_input.addItem("Cliente", "cliente")
+        self.agrupamento_input.addItem("Serviço", "servico")
+        self.agrupamento_input.setCurrentIndex(1)
+        self.agrupamento_input.currentIndexChanged.connect(lambda *_: self.update_relatorios())
+        agrupamento_layout.addWidget(self.agrupamento_input)
+        agrupamento_layout.addStretch()
+
+        self.indexar_status_label = QLabel()
+        agrupamento_layout.addWidget(self.indexar_status_label)
+        self.indexar_btn = QPushButton("Indexar PDFs antigos")
+        self.indexar_btn.setProperty("variante", "primario")
+        self.indexar_btn.clicked.connect(self.index_archive)
+        agrupamento_layout.addWidget(self.indexar_btn)
+        relatorios_layout.addLayout(agrupamento_layout)
+
+        grafico_group = QGroupBox("Total por período")
+        grafico_group.setProperty("variante", "card")
+        grafico_layout = QVBoxLayout(grafico_group)
+        self.grafico_relatorios = GraficoBarras()
+        grafico_layout.addWidget(self.grafico_relatorios)
+        relatorios_layout.addWidget(grafico_group)
+        self.grafico_relatorios_group = grafico_group
+
+        self.relatorios_table = QTableWidget(0, 3)
+        self.relatorios_table.setHorizontalHeaderLabels(["", "Orçamentos", "Total"])
+        self.relatorios_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.relatorios_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.relatorios_table.setAlternatingRowColors(True)
+        relatorios_layout.addWidget(self.relatorios_table, 1)
+
+    def index_archive(self):
+        self.indexar_btn.setEnabled(False)
+        self.indexar_status_label.setText("Procurando PDFs...")
+        self.indexador = IndexadorThread(self.pdf_save_folder, self.base, hash_logo(self.config))
+        self.indexador.progresso.connect(
+            lambda n, total: self.indexar_status_label.setText(f"Indexando {n}/{total}...")
+        )
+        self.indexador.concluido.connect(self.on_archive_indexed)
+        self.indexador.falhou.connect(self.on_archive_index_failed)
+        self.indexador.start()
+
+    def on_archive_indexed(self, resumo):
+        self.indexar_btn.setEnabled(True)
+        self.indexar_status_label.setText(
+            f"{resumo['indexados']} indexado(s), {resumo['ignorados']} sem alteração, "
+            f"{resumo['erros']} erro(s) — {resumo['arquivos_por_segundo']:.1f} arquivos/s"
+        )
+        self.update_relatorios()
 
-        if len(self.services) == 0:
-            QMessageBox.warning(self, "Dados incompletos", "Adicione pelo menos um serviço")
-            return
+    def on_archive_index_failed(self, mensagem):
+        self.indexar_btn.setEnabled(True)
+        self.indexar_status_label.setText("")
+        QMessageBox.critical(self, "Erro", f"Erro ao indexar PDFs:\n{mensagem}")
 
-        cliente_info = (nome, endereco, numero, data)
+    def update_relatorios(self):
+        agrupamento = self.agrupamento_input.currentData()
+        inicio = time.perf_counter()
+        try:
+            linhas = self.base.agregados(agrupamento)
+        except Exception as e:
+            QMessageBox.critical(self, "Erro", f"Erro ao carregar relatórios:\n{e}")
+            return
 
-        itens = []
-        for s in self.services:
-            itens.append((
-                s["quantity"],
-                s["description"],
-                f"{s['unit_price']:.2f}",
-                s["total"]
-            ))
+        titulo_coluna = self.agrupamento_input.currentText()
+        if agrupamento == "servico":
+            self.relatorios_table.setHorizontalHeaderLabels([titulo_coluna, "Unidades", "Total"])
+        else:
+            self.relatorios_table.setHorizontalHeaderLabels([titulo_coluna, "Orçamentos", "Total"])
 
-        pasta_data = data.replace("/", "-")
-        pasta_destino = os.path.join(self.pdf_save_folder, pasta_data)
-        os.makedirs(pasta_destino, exist_ok=True)
+        def rotulo(chave):
+            if agrupamento in ("dia", "mes"):
+                return "/".join(reversed(chave.split("-")))
+            return chave
 
-        nome_arquivo_pdf = f"{nome if nome else 'Orcamento'}_{pasta_data}.pdf"
-        caminho_pdf = os.path.join(pasta_destino, nome_arquivo_pdf)
+        self.relatorios_table.setUpdatesEnabled(False)
+        try:
+            self.relatorios_table.setRowCount(len(linhas))
+            for row, (chave, quantidade, total) in enumerate(linhas):
+                self.relatorios_table.setItem(row, 0, QTableWidgetItem(rotulo(chave)))
+                self.relatorios_table.setItem(row, 1, QTableWidgetItem(str(quantidade)))
+                self.relatorios_table.setItem(row, 2, QTableWidgetItem(formatar_moeda(total)))
+        finally:
+            self.relatorios_table.setUpdatesEnabled(True)
+
+        if agrupamento in ("dia", "mes"):
+            barras = linhas[-RELATORIO_MAX_BARRAS:]
+            self.grafico_relatorios_group.setTitle(f"Últimos {len(barras)} período(s)")
+        else:
+            barras = linhas[:RELATORIO_MAX_BARRAS]
+            self.grafico_relatorios_group.setTitle(f"Maiores {len(barras)} por total")
+        self.grafico_relatorios.set_dados([(rotulo(chave), total) for chave, _, total in barras])
+        if DEBUG_TEMPOS:
+            print(f"Relatório por {agrupamento} carregado em {(time.perf_counter() - inicio) * 1000:.1f} ms")
+
+    def restore_sessions(self):
+        inicio = time.perf_counter()
+        estados = {}
+        for numero in diarios_existentes():
+            try:
+                estado = DiarioOrcamento.ler(caminho_diario(numero))
+            except Exception as e:
+                print(f"Erro ao ler diário: {e}")
+                continue
+            cliente = estado["cliente"]
+            # Orçamentos com o PDF já gerado não têm nada a recuperar
+            if not estado["finalizado"] and (
+                estado["servicos"] or any(cliente.get(c) for c in ("nome", "endereco", "numero"))
+            ):
+                estados[numero] = estado
+                continue
+            abertas = {aba.numero: aba for aba in self.abas()}
+            if numero in abertas:
+                abertas[numero].diario.limpar()
+            else:
+                os.remove(caminho_diario(numero))
+        if DEBUG_TEMPOS:
+            print(f"Diários lidos em {(time.perf_counter() - inicio) * 1000:.1f} ms")
+        if not estados:
+            return
 
+        if len(estados) == 1:
+            estado = next(iter(estados.values()))
+            mensagem = f"Foi encontrado um orçamento não finalizado com {len(estado['servicos'])} serviço(s).\nDeseja restaurá-lo?"
+        else:
+            mensagem = f"Foram encontrados {len(estados)} orçamentos não finalizados.\nDeseja restaurá-los?"
+        resposta = QMessageBox.question(self, "Recuperar orçamento", mensagem)
+
+        abertas = {aba.numero: aba for aba in self.abas()}
+        for numero, estado in sorted(estados.items()):
+            aba = abertas.get(numero)
+            if resposta == QMessageBox.StandardButton.Yes:
+                if aba is None:
+                    aba = self.new_tab(numero)
+                aba.restore_state(estado)
+            elif aba is not None:
+                aba.diario.limpar()
+            else:
+                os.remove(caminho_diario(numero))
+        self.tabs.setCurrentIndex(0)
+
+    def on_preview_rendered(self, chave, imagens):
+        guardar_preview(chave, imagens)
+        for aba in self.abas():
+            aba.on_preview_rendered(chave, imagens)
+
+    def on_preview_failed(self, chave, mensagem):
+        for aba in self.abas():
+            aba.on_preview_failed(chave)
+
+    def pool_render(self):
+        # Criado no primeiro PDF para não atrasar a abertura.
+        # Um processo morto (falta de memória, por exemplo) inutiliza o pool: cria outro
+        if self._pool_render is None or self._pool_render._broken:
+            self._pool_render = pool_processos(RENDER_WORKERS)
+        return self._pool_render
+
+    def on_pdf_saved(self, caminho_pdf, contexto):
         try:
-            gerar_orcamento_pdf(caminho_pdf, itens, cliente_info, self.config)
-            QMessageBox.information(self, "Sucesso", f"PDF gerado com sucesso:\n{caminho_pdf}")
+            if os.path.isfile(caminho_pdf):
+                st = os.stat(caminho_pdf)
+                self.base.registrar(caminho_pdf, contexto["cliente_info"], contexto["itens"], st.st_mtime, st.st_size,
+                                    contexto["marca"])
+            else:
+                self.base.registrar(caminho_pdf, contexto["cliente_info"], contexto["itens"], marca=contexto["marca"])
         except Exception as e:
-            QMessageBox.critical(self, "Erro", f"Erro ao gerar o PDF:\n{e}")
-
-    def format_currency(self, value: float) -> str:
-        return f"R$ {value:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+            print(f"Erro ao registrar orçamento nos relatórios: {e}")
+        # A aba pode ter sido fechada enquanto o PDF era gravado
+        if contexto["aba"] in self.abas():
+            contexto["aba"].mark_finished(contexto["alteracoes"])
+        QMessageBox.information(self, "Sucesso", f"PDF gerado com sucesso:\n{caminho_pdf}")
+
+    def on_pdf_save_error(self, mensagem, contexto):
+        QMessageBox.critical(self, "Erro", f"Erro ao gerar o PDF:\n{mensagem}")
+
+    def closeEvent(self, event):
+        for aba in self.abas():
+            aba.fechar()
+        if self.regerador is not None:
+            self.regerador.parar()
+        self.motor_preview.parar()
+        # O gravador ainda espera pelos renders na fila: o pool só encerra depois dele
+        self.gravador.parar()
+        if self._pool_render is not None:
+            self._pool_render.shutdown()
+        self.base.fechar()
+        super().closeEvent(event)
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
-
-    # Estilo do app principal (BudgetGenerator)
-    app.setStyleSheet("""
-        QWidget {
-            background-color: #f0f4f8;
-            color: #334155;
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            font-size: 14px;
-        }
-        QLineEdit, QTextEdit, QDateEdit, QTableWidget {
-            background-color: white;
-            color: #334155;
-            border: 1px solid #cbd5e1;
-            border-radius: 4px;
-        }
-        QPushButton {
-            background-color: #60a5fa;
-            color: white;
-            border-radius: 6px;
-            padding: 6px;
-        }
-        QPushButton:hover {
-            background-color: #3b82f6;
-        }
-        QHeaderView::section {
-            background-color: #e2e8f0;
-            color: #334155;
-            font-weight: 600;
-            border: none;
-        }
-        QTableWidget {
-            gridline-color: #cbd5e1;
-        }
-        QTableWidget::item:selected {
-            background-color: #bfdbfe;
-            color: #1e293b;
-        }
-    """)
+    multiprocessing.freeze_support()
+    parser = argparse.ArgumentParser(description="Gerador de Orçamentos")
+    parser.add_argument("--benchmark-io", metavar="PASTA",
+                        help="mede a geração de PDF em disco (ex.: pasta de rede) contra a geração em memória")
+    parser.add_argument("--verificar-determinismo", nargs="?", const=ARQUIVO_REFERENCIA, metavar="REFERENCIA",
+                        help="confere que o modo determinístico gera PDFs idênticos ao PDF de referência "
+                             f"(padrão: {ARQUIVO_REFERENCIA}) e mede o tempo de render")
+    parser.add_argument("--servidor", action="store_true", help="inicia o servidor HTTP local de orçamentos")
+    parser.add_argument("--host", default=SERVIDOR_HOST,
+                        help="endereço do servidor; use 127.0.0.1 para aceitar só conexões desta máquina")
+    parser.add_argument("--porta", type=int, default=SERVIDOR_PORTA)
+    parser.add_argument("--workers", type=int, help="processos de render/indexação")
+    parser.add_argument("--fila", type=int, default=SERVIDOR_FILA_MAX)
+    parser.add_argument("--teste-carga", metavar="URL", help="dispara requisições contra o servidor, ex.: http://localhost:8765/orcamento")
+    parser.add_argument("--requisicoes", type=int, default=200)
+    parser.add_argument("--concorrencia", type=int, default=16)
+    parser.add_argument("--indexar", metavar="PASTA", help="indexa os PDFs já gerados na pasta (só os novos ou alterados)")
+    parser.add_argument("--regerar", action="store_true",
+                        help="regera os orçamentos registrados que ainda usam outra marca (textos ou logo)")
+    parser.add_argument("--incluir-sem-marca", action="store_true",
+                        help="com --regerar, também regera orçamentos registrados sem marca conhecida")
+    parser.add_argument("--buscar", metavar="TEXTO", help="procura orçamentos indexados por cliente, endereço ou serviço")
+    parser.add_argument("--extrair", nargs=2, metavar=("ORIGEM", "DESTINO"),
+                        help="copia um PDF arquivado ('AAAA-MM.orcpak#nome.pdf') para um arquivo comum")
+    parser.add_argument("--medir-inicio", action="store_true",
+                        help="abre a janela principal, mede o tempo até interativo e sai (código 1 se passar do limite)")
+    args, qt_args = parser.parse_known_args()
+
+    if args.benchmark_io:
+        benchmark_io(args.benchmark_io)
+        sys.exit(0)
+    if args.verificar_determinismo is not None:
+        sys.exit(0 if verificar_determinismo(args.verificar_determinismo) else 1)
+    if args.servidor:
+        iniciar_servidor(host=args.host, porta=args.porta, workers=args.workers or SERVIDOR_WORKERS, fila_max=args.fila)
+        sys.exit(0)
+    if args.teste_carga:
+        teste_carga(args.teste_carga, args.requisicoes, args.concorrencia)
+        sys.exit(0)
+    if args.indexar:
+        base = BaseOrcamentos(DADOS_FILE)
+        indexar_pdfs(os.path.abspath(args.indexar), base, workers=args.workers, logo=hash_logo(load_config()))
+        base.fechar()
+        sys.exit(0)
+    if args.regerar:
+        base = BaseOrcamentos(DADOS_FILE)
+        regerar_orcamentos(base, load_config(), workers=args.workers, incluir_sem_marca=args.incluir_sem_marca)
+        base.fechar()
+        sys.exit(0)
+    if args.extrair:
+        with open(args.extrair[1], "wb") as f:
+            f.write(ler_pdf_arquivado(args.extrair[0]))
+        sys.exit(0)
+    if args.buscar:
+        base = BaseOrcamentos(DADOS_FILE)
+        for caminho, cliente, data, total in base.buscar(args.buscar):
+            print(f"{data}  {cliente:<30}  R$ {formatar_valor(total):>12}  {caminho}")
+        base.fechar()
+        sys.exit(0)
+
+    app = QApplication(sys.argv[:1] + qt_args)
+
+    aplicar_tema(load_config().get("tema", TEMA_PADRAO))
+
+    if args.medir_inicio:
+        janela = BudgetGenerator(restaurar_sessao=False)
+        janela.show()
+        while janela.tempo_interativo_ms is None:
+            app.processEvents()
+        janela.close()
+        sys.exit(0 if janela.tempo_interativo_ms <= TEMPO_INTERATIVO_LIMITE_MS else 1)
 
     launcher = LauncherWindow()
     launcher.show()
@@ -0,0 +1,68 @@
+"""PDF de referência do modo determinístico.
+
+Se uma mudança no layout (ou uma atualização do ReportLab) alterar o PDF de propósito,
+gere a referência de novo com:  python tests/test_pdf_deterministico.py
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Fontes e logo são procuradas a partir da pasta do projeto
+os.chdir(RAIZ)
+sys.path.insert(0, RAIZ)
+
+import index  # noqa: E402
+
+REFERENCIA = os.path.join(RAIZ, index.ARQUIVO_REFERENCIA)
+REPETICOES = 7
+
+
+def renderizar(deterministico=True):
+    itens, cliente_info, config = index.entrada_referencia()
+    return index.gerar_orcamento_pdf_bytes(itens, cliente_info, config, deterministico)
+
+
+def test_renders_seguidos_sao_identicos():
+    assert len({renderizar() for _ in range(3)}) == 1
+
+
+def test_igual_ao_pdf_de_referencia():
+    with open(REFERENCIA, "rb") as f:
+        assert renderizar() == f.read()
+
+
+def test_outro_processo_gera_os_mesmos_bytes(tmp_path):
+    # Outra semente de hash e fontes registradas do zero
+    destino = tmp_path / "orcamento.pdf"
+    codigo = (
+        "import index; itens, cliente_info, config = index.entrada_referencia(); "
+        f"index.gerar_orcamento_pdf({str(destino)!r}, itens, cliente_info, config, deterministico=True)"
+    )
+    subprocess.run([sys.executable, "-c", codigo], cwd=RAIZ, check=True, capture_output=True,
+                   env={**os.environ, "PYTHONHASHSEED": "12345"})
+    assert destino.read_bytes() == renderizar()
+
+
+def test_tempo_de_render_deterministico():
+    # Amostras intercaladas: ruído da máquina afeta os dois modos por igual
+    amostras = {False: [], True: []}
+    renderizar()
+    for _ in range(REPETICOES):
+        for deterministico in (False, True):
+            inicio = time.perf_counter()
+            renderizar(deterministico)
+            amostras[deterministico].append(time.perf_counter() - inicio)
+    tempos = {modo: statistics.median(valores) for modo, valores in amostras.items()}
+    print(f"Render normal: {tempos[False] * 1000:.1f} ms, determinístico: {tempos[True] * 1000:.1f} ms")
+    # O modo determinístico só fixa metadados: não pode custar bem mais que o normal
+    assert tempos[True] <= tempos[False] * 2
+
+
+if __name__ == "__main__":
+    os.makedirs(os.path.dirname(REFERENCIA), exist_ok=True)
+    with open(REFERENCIA, "wb") as f:
+        f.write(renderizar())
+    print(f"Referência gravada em {REFERENCIA}")
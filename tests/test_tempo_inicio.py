@@ -0,0 +1,49 @@
+"""Regressão do tempo até a janela principal ficar interativa.
+
+Cada medição é um processo novo (imports, fontes e Qt do zero); o teste usa a
+mediana de várias execuções contra a referência da máquina.
+
+É um benchmark, não roda por padrão: o tempo absoluto varia de máquina para máquina.
+Meça a referência uma vez nesta máquina (mediana de algumas execuções de
+"python index.py --medir-inicio") e rode com ela:
+
+    ORCAMENTO_REFERENCIA_INICIO_MS=300 python -m pytest tests/test_tempo_inicio.py
+"""
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import index  # noqa: E402
+
+EXECUCOES = 7
+
+pytestmark = pytest.mark.skipif(
+    "ORCAMENTO_REFERENCIA_INICIO_MS" not in os.environ,
+    reason="benchmark: defina ORCAMENTO_REFERENCIA_INICIO_MS com a referência desta máquina",
+)
+
+
+def medir(home):
+    resultado = subprocess.run(
+        [sys.executable, os.path.join(RAIZ, "index.py"), "--medir-inicio"],
+        cwd=RAIZ, capture_output=True, text=True, timeout=60,
+        env={**os.environ, "HOME": str(home), "QT_QPA_PLATFORM": "offscreen"},
+    )
+    m = re.search(r"Tempo até interativo: (\d+) ms", resultado.stdout)
+    assert m, resultado.stdout + resultado.stderr
+    return int(m.group(1))
+
+
+def test_tempo_ate_interativo(tmp_path):
+    medir(tmp_path)  # a primeira execução aquece o cache de disco
+    mediana = statistics.median(medir(tmp_path) for _ in range(EXECUCOES))
+    print(f"Tempo até interativo (mediana de {EXECUCOES}): {mediana:.0f} ms, "
+          f"referência {index.TEMPO_INTERATIVO_REFERENCIA_MS} ms")
+    assert mediana <= index.TEMPO_INTERATIVO_LIMITE_MS